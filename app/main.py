@@ -4,16 +4,57 @@
 
 A FastAPI application for retrieving statistics from a Git repository.
 """
+import asyncio
+import hashlib
 import logging
 import os
-import re
 import subprocess
+import time
+from collections import Counter
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Annotated, Union
+from typing import Annotated, AsyncIterator, Iterable, Optional, Union
 
-from fastapi import Depends, FastAPI, HTTPException, Query, status
-from pydantic import BaseModel, Field
+from fastapi import Body, Depends, FastAPI, Header, HTTPException, Query, Response, status
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, Field
+
+try:
+    import pygit2
+except ImportError:
+    # pygit2 is optional; without it every query shells out to the git CLI.
+    pygit2 = None
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; without it responses are encoded with the standard json module.
+    orjson = None
+
+
+class GitStatsJSONResponse(JSONResponse):
+    """
+    JSONResponse that renders its body with orjson when it is installed.
+
+    FastAPI's own ORJSONResponse is deprecated and warns on every response, so the body is rendered here instead.
+    """
+
+    def render(self, content) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+RESPONSE_CLASS = GitStatsJSONResponse
+
+# Local branches, sorted, one "<name>\t<marker>" line each, where the marker is "*" for the branch HEAD points to.
+# lstrip=2 rather than refname:short, which would print "heads/<name>" for a branch that shares its name with a tag.
+BRANCH_LIST_ARGS = ("for-each-ref", "--format=%(refname:lstrip=2)%09%(HEAD)", "refs/heads/")
+
+# Log walks a /top_authors_batch request runs at once; a batch walks each revision its queries name once,
+# and running them all together would start as many git processes competing for the same CPUs
+TOP_AUTHORS_BATCH_CONCURRENCY = min(8, os.cpu_count() or 1)
 
 
 class GitStatsLogger:
@@ -21,36 +62,75 @@ class GitStatsLogger:
 
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.logger.setLevel(logging.DEBUG)
-        console_handler = logging.StreamHandler()
-        formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-        console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
+        level_name = os.environ.get("GITSTATS_LOG_LEVEL", "DEBUG").upper()
+        # getLevelName maps a known level name to its number, and anything else to a string
+        level = logging.getLevelName(level_name)
+        self.logger.setLevel(level if isinstance(level, int) else logging.DEBUG)
+        # The logger is shared per module name; don't stack another handler (and duplicate every message)
+        # if it was already configured, e.g. when the module is imported again on reload
+        if not self.logger.handlers:
+            console_handler = logging.StreamHandler()
+            formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+            console_handler.setFormatter(formatter)
+            self.logger.addHandler(console_handler)
+        if not isinstance(level, int):
+            self.logger.warning("Unknown GITSTATS_LOG_LEVEL %r, using DEBUG", level_name)
 
-    def debug(self, message: str):
-        self.logger.debug(message)
+    def debug(self, message: str, *args):
+        self.logger.debug(message, *args)
 
-    def info(self, message: str):
-        self.logger.info(message)
+    def info(self, message: str, *args):
+        self.logger.info(message, *args)
 
-    def warning(self, message: str):
-        self.logger.warning(message)
+    def warning(self, message: str, *args):
+        self.logger.warning(message, *args)
 
-    def error(self, message: str):
-        self.logger.error(message)
+    def error(self, message: str, *args):
+        self.logger.error(message, *args)
+
+    def is_debug_enabled(self) -> bool:
+        """Return True if debug messages are emitted, so callers can skip building them otherwise."""
+        return self.logger.isEnabledFor(logging.DEBUG)
 
 
 class GitStatsConfig:
     """Configuration class for the GitStats application."""
 
+    # Seconds the memoized branch data is trusted, even with an unchanged refs fingerprint; mtimes can
+    # miss a change within the filesystem's timestamp resolution, or on filesystems that don't update them
+    branch_cache_ttl = 5.0
+
     def __init__(self):
         self.repo_path: Path | None = None
+        # str(repo_path), reported in every response body
+        self.repo_path_str: str | None = None
+        # The last repo argument that set_repo_path resolved successfully
+        self._last_repo_input: str | None = None
         self.branch: str | None = None
-        self.repo_command: list[str] = []
-        self.log_command: list[str] = []
-        self.log_stat_command: list[str] = []
-
-    def set_repo_path(self, repo: str = None) -> Path | None:
+        # pygit2.Repository, opened once per repo_path when pygit2 is installed
+        self.repo = None
+        # Immutable command prefixes; handlers build each command with [*prefix, ...]
+        self.repo_command: tuple[str, ...] = ()
+        self.log_command: tuple[str, ...] = ()
+        self.log_stat_command: tuple[str, ...] = ()
+        # The repository's git directory, and the directory holding its refs, which differs from git_dir in a linked worktree
+        self.git_dir: Path | None = None
+        self.common_dir: Path | None = None
+        # Memoized repository branch data, valid for branch_cache_ttl seconds while the refs fingerprint in refs_state is unchanged
+        self.current_branch_cache: str | None = None
+        self.branches_cache: list[str] | None = None
+        # The same branches as a set, for membership tests
+        self.branch_set_cache: frozenset[str] | None = None
+        self.refs_state: tuple[int, ...] | None = None
+        # time.monotonic() when refs_state was taken
+        self.refs_checked_at = 0.0
+        # Guard the settings above across awaits, see using_repo and changing. Created on first use,
+        # inside the running event loop, and _idle is set while no request holds them shared.
+        self._state_lock: asyncio.Lock | None = None
+        self._idle: asyncio.Event | None = None
+        self._readers = 0
+
+    async def set_repo_path(self, repo: str = None) -> Path | None:
         """
         Set the repository path.
 
@@ -66,6 +146,10 @@ class GitStatsConfig:
         if not repo:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing repo parameter.")
 
+        # Handlers pass the same repo on every request; skip re-resolving and re-validating it
+        if repo == self._last_repo_input and self.repo_path:
+            return self.repo_path
+
         if repo == "ENV":
             repo_path = os.environ.get("GITSTATS_REPO_PATH", None)
             if not repo_path:
@@ -79,36 +163,255 @@ class GitStatsConfig:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Repository path {repo_path} does not exist or is not a directory.")
 
         self.repo_path = repo_path
+        self.repo_path_str = str(repo_path)
+        self._last_repo_input = repo
+        self.repo = self._open_repo(repo_path)
+        self.git_dir, self.common_dir = await self._find_git_dirs(repo_path)
+        self.clear_branch_cache()
         self._set_commands()
         return repo_path
 
+    def is_current_repo(self, repo: str) -> bool:
+        """Return True if repo is the argument the current repository path was set from."""
+        return bool(self.repo_path) and repo == self._last_repo_input
+
+    def _state_primitives(self) -> tuple[asyncio.Lock, asyncio.Event]:
+        """Return the lock and idle event guarding the settings, creating them on first use."""
+        if self._state_lock is None:
+            self._state_lock = asyncio.Lock()
+            self._idle = asyncio.Event()
+            self._idle.set()
+        return self._state_lock, self._idle
+
+    @asynccontextmanager
+    async def using_repo(self, repo: str | None = None) -> AsyncIterator[None]:
+        """
+        Keep the repository and branch settings unchanged while one request queries the repository.
+
+        Any number of requests may hold them at once. A request for a repository other than the
+        current one first waits for the others to finish, then switches to it with set_repo_path.
+
+        Args:
+            repo: Repository the request asked for, or None to use the current one
+        """
+        lock, idle = self._state_primitives()
+        async with lock:
+            if repo and not self.is_current_repo(repo):
+                await idle.wait()
+                await self.set_repo_path(repo)
+            self._readers += 1
+            idle.clear()
+        try:
+            yield
+        finally:
+            self._readers -= 1
+            if not self._readers:
+                idle.set()
+
+    @asynccontextmanager
+    async def changing(self) -> AsyncIterator[None]:
+        """Hold the repository and branch settings exclusively, waiting for requests using them to finish."""
+        lock, idle = self._state_primitives()
+        async with lock:
+            await idle.wait()
+            yield
+
+    def clear_repo_path(self):
+        """Forget the repository path and everything derived from it."""
+        self.repo_path = None
+        self.repo_path_str = None
+        self._last_repo_input = None
+        self.repo = None
+        self.git_dir = None
+        self.common_dir = None
+        self.clear_branch_cache()
+
+    def clear_branch_cache(self):
+        """Forget the memoized branch list and current branch."""
+        self.current_branch_cache = None
+        self.branches_cache = None
+        self.branch_set_cache = None
+        self.refs_state = None
+
+    def sync_branch_cache(self):
+        """Clear the memoized branch data if the repository refs changed since it was stored, or it expired."""
+        state = self.refs_fingerprint()
+        now = time.monotonic()
+        if state != self.refs_state or now - self.refs_checked_at > self.branch_cache_ttl:
+            self.clear_branch_cache()
+            self.refs_state = state
+            self.refs_checked_at = now
+
+    def refs_fingerprint(self) -> tuple[int, ...]:
+        """Return the refs fingerprint of the current repository, see GitCommandCache.repo_state."""
+        return GitCommandCache.repo_state(self.git_dir, self.common_dir)
+
+    @staticmethod
+    async def _find_git_dirs(repo_path: Path) -> tuple[Path, Path]:
+        """
+        Resolve the git directory and common directory of repo_path.
+
+        repo_path/.git is only right for a plain working tree: a bare repository has no .git, and in a
+        linked worktree or submodule .git is a file pointing elsewhere. Ask git once, when the repository is set.
+        """
+        output = await GitCommandExecutor.execute(["git", "-C", str(repo_path), "rev-parse", "--git-dir", "--git-common-dir"])
+        try:
+            git_dir, common_dir = output.get("command_output", "").splitlines()
+        except ValueError:
+            # Not a repository; every git command will fail, so the fingerprint doesn't matter
+            return repo_path / ".git", repo_path / ".git"
+        # Both are printed relative to repo_path unless they lie outside it
+        return (repo_path / git_dir).resolve(), (repo_path / common_dir).resolve()
+
+    @staticmethod
+    def _open_repo(repo_path: Path):
+        """Open the repository in-process with pygit2, or return None if that isn't possible."""
+        if pygit2 is None:
+            return None
+        try:
+            return pygit2.Repository(str(repo_path))
+        except pygit2.GitError:
+            return None
+
     def _set_commands(self):
         """Set the git command templates."""
         if self.repo_path:
-            self.repo_command = ["git", "-C", str(self.repo_path)]
-            self.log_command = self.repo_command + ["log"]
-            self.log_stat_command = self.log_command + ["--stat"]
+            # Point git straight at the repository so it doesn't discover it from the working tree
+            self.repo_command = ("git", "--git-dir", str(self.git_dir))
+            self.log_command = self.repo_command + ("log",)
+            # One summary line per commit and no commit metadata, e.g. " 3 files changed, 10 insertions(+), 2 deletions(-)"
+            self.log_stat_command = self.log_command + ("--shortstat", "--pretty=format:")
 
 
 class GitCommandExecutor:
     """Class for executing git commands."""
 
-    @staticmethod
-    def execute(command: list[str]) -> dict:
+    # Every query is read-only: don't take optional locks (e.g. to refresh the index) and skip locale handling
+    env = {**os.environ, "GIT_OPTIONAL_LOCKS": "0", "LC_ALL": "C"}
+    # Bytes read from a streamed command's stdout at a time
+    chunk_size = 1 << 16
+
+    @classmethod
+    async def execute(cls, command: list[str]) -> dict:
         """
         Execute a shell command and return the output.
 
+        The command runs as an asyncio subprocess, so the event loop keeps serving other
+        requests while git is running.
+
         Args:
             command: A list of strings representing the command and its arguments
 
         Returns:
             Dictionary with command output or error message
         """
+        proc = await asyncio.create_subprocess_exec(*command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, env=cls.env)
+        stdout, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            return {"ERROR": stderr.decode().strip()}
+        return {"command_output": stdout.decode().strip()}
+
+    @classmethod
+    async def stream(cls, command: list[str]) -> AsyncIterator[str]:
+        """
+        Execute a shell command and yield its output line by line as it is produced.
+
+        Use this instead of execute for commands with large output, so that the output is
+        never held in memory as a whole.
+
+        Args:
+            command: A list of strings representing the command and its arguments
+
+        Yields:
+            Lines of standard output, without the trailing newline
+
+        Raises:
+            subprocess.CalledProcessError: If the command exits with a non-zero status
+        """
+        proc = await asyncio.create_subprocess_exec(*command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, env=cls.env)
+        # Drain stderr alongside stdout; git blocks if it fills the stderr pipe while stdout is still being read
+        stderr_task = asyncio.ensure_future(proc.stderr.read())
         try:
-            result = subprocess.run(command, capture_output=True, text=True, check=True)
-            return {"command_output": result.stdout.strip()}
-        except subprocess.CalledProcessError as e:
-            return {"ERROR": e.stderr.strip()}
+            # Read in large chunks rather than awaiting readline() once per line, which dominates on long outputs.
+            # Only complete lines are decoded, so a multi-byte character is never split across chunks.
+            pending = b""
+            while chunk := await proc.stdout.read(cls.chunk_size):
+                pending += chunk
+                end = pending.rfind(b"\n")
+                if end < 0:
+                    continue
+                for line in pending[:end].decode().split("\n"):
+                    yield line
+                pending = pending[end + 1 :]
+            if pending:
+                yield pending.decode()
+            stderr = await stderr_task
+            if await proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, command, stderr=stderr.decode())
+        finally:
+            # Don't leave git running if the caller stopped reading early
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            stderr_task.cancel()
+
+
+class GitCommandCache:
+    """Short-lived cache for the output of read-only git commands."""
+
+    def __init__(self, ttl: float = 5.0, max_entries: int = 128):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[tuple[str, ...], tuple[float, tuple[int, ...], dict]] = {}
+
+    @staticmethod
+    def repo_state(git_dir: Path, common_dir: Path) -> tuple[int, ...]:
+        """
+        Return a cheap fingerprint of the repository refs.
+
+        The mtimes of HEAD, packed-refs and every directory under refs/heads change whenever a branch
+        is checked out, created, deleted or moved, so they invalidate cached output without running git.
+        Branch files are written to a lock file and renamed into place, which updates the mtime of the
+        directory holding them; nested names such as feature/x live in subdirectories, so walk them all.
+        """
+        state = []
+        for path in (git_dir / "HEAD", common_dir / "packed-refs"):
+            try:
+                state.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                state.append(0)
+        directories = 0
+        newest = 0
+        for directory, _, _ in os.walk(common_dir / "refs" / "heads"):
+            directories += 1
+            try:
+                newest = max(newest, os.stat(directory).st_mtime_ns)
+            except OSError:
+                pass
+        state += (directories, newest)
+        return tuple(state)
+
+    def get(self, command: tuple[str, ...], state: tuple[int, ...]) -> dict | None:
+        """Return a copy of the cached output for command, or None if it is missing or stale."""
+        entry = self._entries.get(command)
+        if entry is None:
+            return None
+        stored_at, stored_state, output = entry
+        if stored_state != state or time.monotonic() - stored_at > self.ttl:
+            del self._entries[command]
+            return None
+        return dict(output)
+
+    def set(self, command: tuple[str, ...], state: tuple[int, ...], output: dict):
+        """Store the output of command for the given repository state."""
+        if len(self._entries) >= self.max_entries:
+            # Evict the oldest entry; dicts preserve insertion order
+            del self._entries[next(iter(self._entries))]
+        self._entries[command] = (time.monotonic(), state, dict(output))
+
+    def clear(self):
+        """Drop all cached output."""
+        self._entries.clear()
 
 
 class GitRepositoryService:
@@ -118,37 +421,182 @@ class GitRepositoryService:
         self.config = config
         self.logger = logger
         self.executor = GitCommandExecutor()
+        self.cache = GitCommandCache()
+
+    async def execute_cached(self, command: list[str]) -> dict:
+        """Execute a read-only git command, reusing its output while the repository refs are unchanged."""
+        key = tuple(command)
+        state = self.config.refs_fingerprint()
+        output = self.cache.get(key, state)
+        if output is not None:
+            if self.logger.is_debug_enabled():
+                self.logger.debug("Cache hit: %s", " ".join(command))
+            return output
+
+        output = await self.executor.execute(command)
+        if "ERROR" not in output:
+            self.cache.set(key, state, output)
+        return output
+
+    async def get_branches(self) -> dict:
+        """
+        Get the list of branches in the repository.
 
-    def get_branches(self) -> list[str]:
-        """Get the list of branches in the repository."""
-        command = self.config.repo_command + ["branch", "--list"]
-        output = self.executor.execute(command)
+        Returns:
+            Dictionary with branches, or error message
+        """
+        self.config.sync_branch_cache()
+        output = await self._cached_branches()
         if "ERROR" in output:
-            return []
-
-        command_output = output.get("command_output", "")
-        branches = [line.strip() for line in command_output.splitlines() if line.strip()]
-        # Remove leading '*' from the current branch
-        branches = [line.lstrip("*").strip() for line in branches]
-        return branches
-
-    def is_branch_in_repo(self, branch: str) -> bool:
+            return output
+        return {"branches": list(output["branches"])}
+
+    async def _cached_branches(self) -> dict:
+        """Return the memoized branch list under "branches", reading it first if needed. Callers must not modify it."""
+        if self.config.branches_cache is None:
+            output = await self._read_branches()
+            if "ERROR" in output:
+                # Not memoized, so the next request asks git again
+                return output
+            self.config.branches_cache = output["branches"]
+        return {"branches": self.config.branches_cache}
+
+    async def _read_branches(self) -> dict:
+        """Read the list of branches from the repository, returning it under "branches", or an error message."""
+        if self.config.repo is not None:
+            return {"branches": sorted(self.config.repo.branches.local)}
+
+        command = [*self.config.repo_command, *BRANCH_LIST_ARGS]
+        output = await self.executor.execute(command)
+        if "ERROR" in output:
+            return output
+
+        branches = []
+        for line in output["command_output"].splitlines():
+            name, _, marker = line.partition("\t")
+            branches.append(name)
+            # Remember the current branch while we're at it, saving get_current_branch a git call.
+            # With a detached or unborn HEAD no line is marked and get_current_branch asks git itself.
+            if marker.strip() == "*":
+                self.config.current_branch_cache = name
+        return {"branches": branches}
+
+    async def is_branch_in_repo(self, branch: str) -> bool:
         """Check if a branch exists in the repository."""
-        branches = self.get_branches()
-        return branch in branches
-
-    def get_current_branch(self) -> str:
+        self.config.sync_branch_cache()
+        if self.config.branch_set_cache is None:
+            output = await self._cached_branches()
+            if "ERROR" in output:
+                return False
+            self.config.branch_set_cache = frozenset(output["branches"])
+        return branch in self.config.branch_set_cache
+
+    async def get_current_branch(self) -> str:
         """Get the current branch in the repository."""
         if self.config.branch:
-            self.logger.debug(f"Using previously-set branch: {self.config.branch}")
+            self.logger.debug("Using previously-set branch: %s", self.config.branch)
             return self.config.branch
 
-        command = self.config.repo_command + ["branch", "--show-current"]
-        output = self.executor.execute(command)
+        self.config.sync_branch_cache()
+        if self.config.current_branch_cache is None:
+            self.config.current_branch_cache = await self._read_current_branch()
+        return self.config.current_branch_cache
+
+    async def _read_current_branch(self) -> str:
+        """Read the branch that HEAD points to from the repository."""
+        repo = self.config.repo
+        if repo is not None:
+            # Match `git branch --show-current`, which prints nothing for a detached or unborn HEAD
+            if repo.head_is_unborn or repo.head_is_detached:
+                return ""
+            return repo.head.shorthand
+
+        branch = self.read_head_branch()
+        if branch is not None:
+            return branch
+
+        # Exits non-zero, printing nothing, when HEAD is detached
+        command = [*self.config.repo_command, "symbolic-ref", "--quiet", "--short", "HEAD"]
+        output = await self.executor.execute(command)
         if "ERROR" in output:
             return ""
         return output.get("command_output", "").strip()
 
+    def read_head_branch(self) -> str | None:
+        """
+        Read the current branch from the repository's HEAD file, without running git.
+
+        Returns:
+            The branch name, "" if HEAD is detached, or None if HEAD can't be read this way
+        """
+        try:
+            head = (self.config.git_dir / "HEAD").read_text().strip()
+        except OSError:
+            return None
+
+        if head.startswith("ref: refs/heads/"):
+            return head[len("ref: refs/heads/") :]
+        # A detached HEAD holds a SHA-1 or SHA-256 object id
+        if len(head) in (40, 64):
+            return ""
+        return None
+
+    async def get_commit_count(self, branch: str | None = None, first_parent: bool = False) -> dict:
+        """
+        Count the commits reachable from HEAD and, if given, from branch.
+
+        Args:
+            branch: Optional branch whose history is included in the count
+            first_parent: Follow only the first parent of merge commits, as git rev-list --first-parent does
+
+        Returns:
+            Dictionary with the equivalent git command and either commit_count or an error message
+        """
+        command = [*self.config.repo_command, "rev-list", "--count"]
+        if first_parent:
+            command.append("--first-parent")
+        command.append("HEAD")
+        if branch:
+            command.extend(("--end-of-options", branch))
+
+        # The count only changes when a ref moves, so reuse it while the refs are unchanged
+        key = tuple(command)
+        state = self.config.refs_fingerprint()
+        output = self.cache.get(key, state)
+        if output is not None:
+            return output
+
+        output = await self._count_commits(command, branch, first_parent)
+        if "ERROR" not in output:
+            self.cache.set(key, state, output)
+        return output
+
+    async def _count_commits(self, command: list[str], branch: str | None, first_parent: bool) -> dict:
+        """Count commits with pygit2 when available, otherwise by running command."""
+        output = {"command": " ".join(command)}
+
+        repo = self.config.repo
+        if repo is not None:
+            try:
+                walker = repo.walk(repo.head.target, pygit2.GIT_SORT_NONE)
+                if first_parent:
+                    walker.simplify_first_parent()
+                if branch:
+                    walker.push(repo.branches.local[branch].target)
+            except (pygit2.GitError, KeyError) as error:
+                output["ERROR"] = str(error)
+                return output
+            # Walking a long history takes a while; keep it off the event loop
+            output["commit_count"] = await asyncio.to_thread(sum, (1 for _ in walker))
+            return output
+
+        result = await self.executor.execute(command)
+        if "ERROR" in result:
+            output["ERROR"] = result["ERROR"]
+        else:
+            output["commit_count"] = int(result["command_output"])
+        return output
+
 
 class GitStatsService:
     """Main service class for git statistics operations."""
@@ -164,11 +612,89 @@ class GitStatsService:
         if not self.config.repo_path:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Repository path is not set. Use /set_repo to set the repository path.")
 
-    def validate_branch(self, branch: str):
+    async def validate_branch(self, branch: str):
         """Validate that a branch exists in the repository."""
-        if not self.repo_service.is_branch_in_repo(branch):
+        if not await self.repo_service.is_branch_in_repo(branch):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Branch '{branch}' does not exist in the repository {self.config.repo_path}")
 
+    async def get_commit_statistics(self, command: list[str]) -> dict:
+        """
+        Sum the files changed, insertions and deletions reported by a `git log --shortstat` command.
+
+        Args:
+            command: The git log command to run
+
+        Returns:
+            Dictionary with files, insertions and deletions, or error message
+        """
+        files = 0
+        insertions = 0
+        deletions = 0
+        try:
+            async for line in self.executor.stream(command):
+                if not line:
+                    continue
+                for part in line.split(","):
+                    count, _, kind = part.strip().partition(" ")
+                    if kind.startswith("file"):
+                        files += int(count)
+                    elif kind.startswith("insertion"):
+                        insertions += int(count)
+                    elif kind.startswith("deletion"):
+                        deletions += int(count)
+        except subprocess.CalledProcessError as e:
+            return {"ERROR": e.stderr.strip()}
+        return {"files": files, "insertions": insertions, "deletions": deletions}
+
+    async def get_date_ranges(self, queries: list["GetTopAuthorsParams"]) -> dict:
+        """
+        Convert the after and before dates of each query to commit timestamps, the way git log reads them.
+
+        Args:
+            queries: The queries whose dates to convert
+
+        Returns:
+            Dictionary with an (earliest, latest) pair per query, either of which is None if not given, or error message
+        """
+        args = []
+        for query in queries:
+            args.extend(f"--{name}={value}" for name, value in (("since", query.after), ("until", query.before)) if value)
+        if not args:
+            return {"date_ranges": [(None, None)] * len(queries)}
+
+        # rev-parse prints each date option as --max-age=<timestamp> or --min-age=<timestamp>, in order
+        output = await self.executor.execute([*self.config.repo_command, "rev-parse", *args])
+        if "ERROR" in output:
+            return output
+        timestamps = iter(int(line.partition("=")[2]) for line in output["command_output"].splitlines())
+        date_ranges = [(next(timestamps) if query.after else None, next(timestamps) if query.before else None) for query in queries]
+        return {"date_ranges": date_ranges}
+
+    async def count_authors(self, command: list[str], date_ranges: list[tuple[Optional[int], Optional[int]]]) -> dict:
+        """
+        Count each author's commits in one `git log --format=%aN%x00%ct` walk, separately for each date range.
+
+        Args:
+            command: The git log command to run
+            date_ranges: (earliest, latest) commit timestamps to count, either of which may be None for no bound
+
+        Returns:
+            Dictionary with a Counter of commits per author for each date range, or error message
+        """
+        counters = [Counter() for _ in date_ranges]
+        try:
+            async for line in self.executor.stream(command):
+                name, _, timestamp = line.partition("\0")
+                if not timestamp:
+                    continue
+                timestamp = int(timestamp)
+                for counter, (earliest, latest) in zip(counters, date_ranges):
+                    if (earliest is None or timestamp >= earliest) and (latest is None or timestamp <= latest):
+                        counter[name] += 1
+        except subprocess.CalledProcessError as e:
+            return {"ERROR": e.stderr.strip()}
+        return {"authors": counters}
+
     def create_response(self, path: str, method: str = "GET") -> dict:
         """Create a base response dictionary."""
         return {"REQUEST_PATH": path, "REQUEST_METHOD": method}
@@ -183,11 +709,46 @@ class GitStatsService:
             response["STATUS_CODE"] = status.HTTP_400_BAD_REQUEST
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=response)
 
-    def create_success_response(self, response: dict) -> dict:
-        """Create a success response."""
+    def create_success_response(self, response: dict) -> JSONResponse:
+        """
+        Create a success response.
+
+        The body is rendered here rather than returned as a dict, so FastAPI doesn't walk it
+        with jsonable_encoder first. It only holds JSON types already.
+        """
         response.pop("command_output", None)
-        response.update({"STATUS_CODE": status.HTTP_200_OK})
-        return response
+        response["STATUS_CODE"] = status.HTTP_200_OK
+        return RESPONSE_CLASS(response)
+
+    def create_revalidatable_response(self, response: dict, if_none_match: Union[str, None]) -> Response:
+        """
+        Create a success response carrying an ETag of its body.
+
+        If the client already holds that body (`if_none_match` is the request's If-None-Match header),
+        an empty 304 is returned instead, sparing the transfer and the client's decode.
+        """
+        rendered = self.create_success_response(response)
+        etag = f'"{hashlib.sha256(rendered.body).hexdigest()}"'
+        if self.etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        rendered.headers["ETag"] = etag
+        return rendered
+
+    @staticmethod
+    def etag_matches(if_none_match: Union[str, None], etag: str) -> bool:
+        """
+        Return True if an If-None-Match header value matches etag.
+
+        The header may list several tags, or "*" for any; If-None-Match compares them weakly, so a W/ prefix
+        (added e.g. by proxies that recompress the body) is ignored.
+        """
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == etag:
+                return True
+        return False
 
 
 class GitStatsApplication:
@@ -199,13 +760,6 @@ class GitStatsApplication:
         self.repo_service = GitRepositoryService(self.config, self.logger)
         self.stats_service = GitStatsService(self.config, self.logger, self.repo_service)
 
-        # Initialize repository path from environment
-        try:
-            self.config.set_repo_path("ENV")
-        except HTTPException:
-            # It's okay if the environment variable is not set
-            pass
-
     def get_logger(self) -> GitStatsLogger:
         """Dependency function to get the logger."""
         return self.logger
@@ -228,43 +782,62 @@ git_stats_app = GitStatsApplication()
 
 
 # Dependency functions
-def get_logger() -> GitStatsLogger:
+# These only hand out the singletons, so they are async: FastAPI calls async dependencies
+# directly instead of dispatching each one to its threadpool on every request.
+async def get_logger() -> GitStatsLogger:
     return git_stats_app.get_logger()
 
 
-def get_config() -> GitStatsConfig:
+async def get_config() -> GitStatsConfig:
     return git_stats_app.get_config()
 
 
-def get_repo_service(config: GitStatsConfig = Depends(get_config), logger: GitStatsLogger = Depends(get_logger)) -> GitRepositoryService:
+async def get_repo_service() -> GitRepositoryService:
     return git_stats_app.get_repo_service()
 
 
-def get_stats_service(
-    config: GitStatsConfig = Depends(get_config), logger: GitStatsLogger = Depends(get_logger), repo_service: GitRepositoryService = Depends(get_repo_service)
-) -> GitStatsService:
+async def get_stats_service() -> GitStatsService:
     return git_stats_app.get_stats_service()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize the application."""
-    logger = get_logger()
-    config = get_config()
+    logger = git_stats_app.get_logger()
+    config = git_stats_app.get_config()
 
     logger.debug("Initializing GitStats API application...")
-    msg = f"Repository path: {config.repo_path}"
-    logger.debug(msg)
+    # Initialize repository path from environment; set_repo_path runs git, so this waits for the event loop
+    try:
+        await config.set_repo_path("ENV")
+    except HTTPException:
+        # It's okay if the environment variable is not set
+        pass
+    logger.debug("Repository path: %s", config.repo_path)
     yield
 
 
-app = FastAPI(title="GitStats API", description="A FastAPI application for retrieving statistics from a Git repository.", version="1.0.0", lifespan=lifespan)
+app = FastAPI(
+    title="GitStats API",
+    description="A FastAPI application for retrieving statistics from a Git repository.",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=RESPONSE_CLASS,
+)
+# Compress larger responses (e.g. long branch lists) for clients that accept it; small ones aren't worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 
 # Pydantic models for request parameters
+# Query parameters are read-only once parsed; stray whitespace from hand-typed URLs is dropped during validation
+QUERY_PARAMS_CONFIG = ConfigDict(frozen=True, str_strip_whitespace=True)
+
+
 class GetTopAuthorsParams(BaseModel):
     """Query parameter definitions for the `/top_authors` endpoint."""
 
+    model_config = QUERY_PARAMS_CONFIG
+
     branch: Union[str | None] = Field(
         default=None,
         title="Branch Name",
@@ -293,6 +866,13 @@ class GetTopAuthorsParams(BaseModel):
         le=100,
         deprecated=False,
     )
+    min_commits: int = Field(
+        default=1,
+        title="Minimum Commits",
+        description="If provided, return only authors with at least this many commits.",
+        ge=1,
+        deprecated=False,
+    )
     repo: str = Field(
         default=None,
         title="Repository Path",
@@ -302,17 +882,35 @@ class GetTopAuthorsParams(BaseModel):
 
 
 class CommitCountParams(BaseModel):
+    """Query parameter definitions for the `/commit_count` endpoint."""
+
+    model_config = QUERY_PARAMS_CONFIG
+
     branch: Union[str | None] = Field(
         default=None,
         title="Branch Name",
         description="The name of the branch to query. This overrides the current branch set with `/set_branch`.",
         deprecated=False,
     )
+    first_parent: bool = Field(
+        default=False,
+        title="First Parent Only",
+        description="If true, count only the first-parent history, i.e. skip commits that were brought in by merges. Much faster on merge-heavy histories.",
+        deprecated=False,
+    )
+    repo: str = Field(
+        default=None,
+        title="Repository Path",
+        description="The absolute path to the repository.",
+        deprecated=False,
+    )
 
 
 class GetCommitStatisticsParams(BaseModel):
     """Query parameter definitions for the `/commit_statistics` endpoint."""
 
+    model_config = QUERY_PARAMS_CONFIG
+
     branch: Union[str | None] = Field(
         default=None,
         title="Branch Name",
@@ -342,78 +940,182 @@ class GetCommitStatisticsParams(BaseModel):
     )
 
 
-# API Endpoints
-@app.get("/top_authors", tags=["Repository Statistics"])
-async def get_top_authors(
-    params: Annotated[GetTopAuthorsParams, Query()],
-    stats_service: GitStatsService = Depends(get_stats_service),
-    config: GitStatsConfig = Depends(get_config),
-    logger: GitStatsLogger = Depends(get_logger),
-    repo_service: GitRepositoryService = Depends(get_repo_service),
-):
-    """Get the top authors by commit count in the repository."""
-    if not params.repo and not config.repo_path:
-        stats_service.validate_repo_path()
-
-    response = stats_service.create_response("/top_authors")
+class SetRepoBody(BaseModel):
+    """JSON body definition for the `/set_repo` endpoint."""
 
-    if params.repo:
-        config.set_repo_path(params.repo)
+    model_config = QUERY_PARAMS_CONFIG
 
-    # Build the git shortlog command
-    command = config.repo_command + ["shortlog", "-sn"]
+    repo: str = Field(
+        default=None,
+        title="Repository Path",
+        description="The absolute path to the repository.",
+        deprecated=False,
+    )
 
-    if params.after:
-        command.append(f"--after={params.after}")
-    if params.before:
-        command.append(f"--before={params.before}")
 
+# API Endpoints
+async def top_authors_branch(params: GetTopAuthorsParams, stats_service: GitStatsService, config: GitStatsConfig, logger: GitStatsLogger) -> Optional[str]:
+    """Return the branch a `/top_authors` query walks, validating it if the query names one, or None for HEAD."""
     if params.branch:
-        stats_service.validate_branch(params.branch)
-        logger.debug(f"Using branch: {params.branch}")
-        command.append(params.branch)
-    elif config.branch:
-        logger.debug(f"Using previously-set branch: {config.branch}")
-        command.append(config.branch)
-
-    logger.debug(f"get_top_authors(): command: {' '.join(command)}")
-
-    response.update(stats_service.executor.execute(command))
-    stats_service.handle_error_response(response)
-
-    command_output = response.get("command_output", "")
+        await stats_service.validate_branch(params.branch)
+        logger.debug("Using branch: %s", params.branch)
+        return params.branch
+    if config.branch:
+        logger.debug("Using previously-set branch: %s", config.branch)
+        return config.branch
+    return None
 
-    # Parse the shortlog output
-    authors = []
-    for line in command_output.splitlines():
-        line = line.strip()
-        if line:
-            match = re.match(r"^\s*(\d+)\s+(.+)$", line)
-            if match:
-                commit_count = int(match.group(1))
-                author_name = match.group(2).strip()
-                authors.append({"name": author_name, "commit_count": commit_count})
 
-    # Limit the results
-    top_authors = authors[: params.limit]
-    total_authors = len(authors)
+def top_authors_data(params: GetTopAuthorsParams, authors: Iterable[tuple[str, int]], branch: str, repo: str, command: str) -> dict:
+    """
+    Build the `DATA` of a `/top_authors` query from its authors' commit counts, given most commits first.
 
-    logger.debug(f"Found {total_authors} authors, returning top {len(top_authors)}")
+    Every author is counted, but only the first `limit` that have at least `min_commits` are materialized.
+    """
+    top_authors = []
+    total_authors = 0
+    for name, count in authors:
+        total_authors += 1
+        if len(top_authors) < params.limit and count >= params.min_commits:
+            top_authors.append({"name": name, "commit_count": count})
 
     data = {
         "top_authors": top_authors,
         "total_authors": total_authors,
-        "branch": params.branch if params.branch else repo_service.get_current_branch(),
-        "repo": str(config.repo_path),
+        "branch": branch,
+        "repo": repo,
         "limit": params.limit,
-        "command": " ".join(command),
+        "command": command,
     }
 
     if params.after:
         data["after"] = params.after
     if params.before:
         data["before"] = params.before
+    if params.min_commits > 1:
+        data["min_commits"] = params.min_commits
 
+    return data
+
+
+async def collect_top_authors(
+    params: GetTopAuthorsParams,
+    response: dict,
+    stats_service: GitStatsService,
+    config: GitStatsConfig,
+    logger: GitStatsLogger,
+    repo_service: GitRepositoryService,
+) -> dict:
+    """Run the shortlog for one `/top_authors` query against the current repository and return its `DATA`."""
+    # Build the git shortlog command
+    filters = [f"--{name}={value}" for name, value in (("after", params.after), ("before", params.before)) if value]
+    command = [*config.repo_command, "shortlog", "-sn", *filters]
+
+    # A revision that looks like an option (e.g. "--output=<file>") must not be parsed as one
+    revision = await top_authors_branch(params, stats_service, config, logger)
+    if revision:
+        command.extend(("--end-of-options", revision))
+    else:
+        # Without a revision, shortlog reads the log from stdin when stdin isn't a terminal
+        command.append("HEAD")
+
+    command_str = " ".join(command)
+    logger.debug("get_top_authors(): command: %s", command_str)
+
+    if params.branch:
+        branch = params.branch
+        output = await repo_service.execute_cached(command)
+    else:
+        # The current branch lookup doesn't depend on the shortlog, so run both concurrently
+        output, branch = await asyncio.gather(repo_service.execute_cached(command), repo_service.get_current_branch())
+    response.update(output)
+    stats_service.handle_error_response(response)
+
+    # shortlog -sn prints "<count>\t<name>" lines, most commits first, with the count right-aligned
+    lines = (line.partition("\t") for line in response.get("command_output", "").splitlines())
+    authors = ((name.strip(), int(count)) for count, _, name in lines if name)
+    data = top_authors_data(params, authors, branch, config.repo_path_str, command_str)
+    logger.debug("Found %d authors, returning top %d", data["total_authors"], len(data["top_authors"]))
+    return data
+
+
+@app.get("/top_authors", tags=["Repository Statistics"])
+async def get_top_authors(
+    params: Annotated[GetTopAuthorsParams, Query()],
+    if_none_match: Annotated[Union[str, None], Header()] = None,
+    stats_service: GitStatsService = Depends(get_stats_service),
+    config: GitStatsConfig = Depends(get_config),
+    logger: GitStatsLogger = Depends(get_logger),
+    repo_service: GitRepositoryService = Depends(get_repo_service),
+):
+    """Get the top authors by commit count in the repository."""
+    response = stats_service.create_response("/top_authors")
+
+    async with config.using_repo(params.repo):
+        stats_service.validate_repo_path()
+        data = await collect_top_authors(params, response, stats_service, config, logger, repo_service)
+    response.update({"DATA": data})
+    return stats_service.create_revalidatable_response(response, if_none_match)
+
+
+@app.post("/top_authors_batch", tags=["Repository Statistics"])
+async def get_top_authors_batch(
+    queries: Annotated[list[GetTopAuthorsParams], Body(min_length=1, max_length=50)],
+    stats_service: GitStatsService = Depends(get_stats_service),
+    config: GitStatsConfig = Depends(get_config),
+    logger: GitStatsLogger = Depends(get_logger),
+    repo_service: GitRepositoryService = Depends(get_repo_service),
+):
+    """Get the top authors for several queries against one repository in a single request.
+
+    The body is a JSON array of `/top_authors` query parameters, and `DATA` holds their results in the order given.
+    Rather than a shortlog per query, the history of each branch the queries name is walked once, and its
+    commits are counted into every query on that branch whose dates they fall within.
+    """
+    repos = {query.repo for query in queries if query.repo}
+    if len(repos) > 1:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="All queries in a batch must use the same repository.")
+
+    response = stats_service.create_response("/top_authors_batch", "POST")
+    semaphore = asyncio.Semaphore(TOP_AUTHORS_BATCH_CONCURRENCY)
+
+    async def walk(revision: Optional[str], indexes: list[int], date_ranges: list[tuple[Optional[int], Optional[int]]]) -> list[dict]:
+        command = [*config.log_command, "--format=%aN%x00%ct"]
+        # Stop the walk at the widest bounds of the queries sharing it
+        if all(earliest is not None for earliest, _ in date_ranges):
+            command.append(f"--max-age={min(earliest for earliest, _ in date_ranges)}")
+        if all(latest is not None for _, latest in date_ranges):
+            command.append(f"--min-age={max(latest for _, latest in date_ranges)}")
+        command.extend(("--end-of-options", revision or "HEAD"))
+        logger.debug("get_top_authors_batch(): command: %s", " ".join(command))
+
+        async with semaphore:
+            output = await stats_service.count_authors(command, date_ranges)
+        stats_service.handle_error_response({**response, **output})
+        results = []
+        for index, counter in zip(indexes, output["authors"]):
+            # Most commits first, then by name, as shortlog -sn orders them
+            authors = sorted(counter.items(), key=lambda author: (-author[1], author[0]))
+            results.append(top_authors_data(queries[index], authors, revision or current_branch, config.repo_path_str, " ".join(command)))
+        return results
+
+    async with config.using_repo(repos.pop() if repos else None):
+        stats_service.validate_repo_path()
+        revisions = [await top_authors_branch(query, stats_service, config, logger) for query in queries]
+        output = await stats_service.get_date_ranges(queries)
+        stats_service.handle_error_response({**response, **output})
+
+        # Query indexes by the revision they walk
+        walks: dict[Optional[str], list[int]] = {}
+        for index, revision in enumerate(revisions):
+            walks.setdefault(revision, []).append(index)
+        current_branch = await repo_service.get_current_branch() if None in walks else None
+
+        data: list[Optional[dict]] = [None] * len(queries)
+        results = await asyncio.gather(*(walk(revision, indexes, [output["date_ranges"][index] for index in indexes]) for revision, indexes in walks.items()))
+        for indexes, walk_results in zip(walks.values(), results):
+            for index, result in zip(indexes, walk_results):
+                data[index] = result
     response.update({"DATA": data})
     return stats_service.create_success_response(response)
 
@@ -427,34 +1129,36 @@ async def get_commit_count(
     repo_service: GitRepositoryService = Depends(get_repo_service),
 ):
     """Get the total number of commits in the repository."""
-    stats_service.validate_repo_path()
-
-    response = stats_service.create_response("/commit_count")
-    command = config.repo_command + ["rev-list", "--count", "HEAD"]
-    branch = None
+    async with config.using_repo(params.repo if params else None):
+        stats_service.validate_repo_path()
 
-    if params and params.branch:
-        stats_service.validate_branch(params.branch)
-        logger.debug(f"Using branch: {params.branch}")
-        command.append(params.branch)
-        branch = params.branch
-    elif config.branch:
-        logger.debug(f"Using previously-set branch: {config.branch}")
-        command.append(config.branch)
-        branch = config.branch
-
-    logger.debug(f"command: {' '.join(command)}")
-    output = stats_service.executor.execute(command)
-    response.update({"command_output": output.get("command_output", "")})
+        response = stats_service.create_response("/commit_count")
+        branch = None
+        first_parent = bool(params and params.first_parent)
+
+        if params and params.branch:
+            await stats_service.validate_branch(params.branch)
+            logger.debug("Using branch: %s", params.branch)
+            branch = params.branch
+        elif config.branch:
+            logger.debug("Using previously-set branch: %s", config.branch)
+            branch = config.branch
+
+        output = await repo_service.get_commit_count(branch, first_parent)
+        repo_path_str = config.repo_path_str
+    logger.debug("command: %s", output["command"])
+    if "ERROR" in output:
+        response["ERROR"] = output["ERROR"]
     stats_service.handle_error_response(response)
 
     response.update(
         {
             "DATA": {
                 "branch": branch,
-                "command": " ".join(command),
-                "commit_count": int(output.get("command_output")),
-                "repo": str(config.repo_path),
+                "command": output["command"],
+                "commit_count": output["commit_count"],
+                "first_parent": first_parent,
+                "repo": repo_path_str,
             }
         }
     )
@@ -463,53 +1167,59 @@ async def get_commit_count(
 
 @app.get("/branches", tags=["Branch Management"])
 async def get_branches(
+    repo: str = None,
+    if_none_match: Annotated[Union[str, None], Header()] = None,
     stats_service: GitStatsService = Depends(get_stats_service),
     config: GitStatsConfig = Depends(get_config),
     logger: GitStatsLogger = Depends(get_logger),
     repo_service: GitRepositoryService = Depends(get_repo_service),
 ):
     """Get the list of branches in the local repository."""
-    stats_service.validate_repo_path()
-
-    response = stats_service.create_response("/branches")
-    command = config.repo_command + ["branch", "--list"]
+    async with config.using_repo(repo):
+        stats_service.validate_repo_path()
 
-    logger.debug(f"command: {' '.join(command)}")
+        response = stats_service.create_response("/branches")
+        command = [*config.repo_command, *BRANCH_LIST_ARGS]
 
-    output = stats_service.executor.execute(command)
-    command_output = output.get("command_output", "")
-    response.update({"command_output": command_output})
-    stats_service.handle_error_response(response)
+        if logger.is_debug_enabled():
+            logger.debug("command: %s", " ".join(command))
 
-    branches = repo_service.get_branches()
-    data = {"branches": branches, "branch": repo_service.get_current_branch(), "command": " ".join(command), "repo": str(config.repo_path)}
+        # Not gathered: listing the branches also memoizes the current branch, so the second call usually doesn't run git
+        output = await repo_service.get_branches()
+        if "ERROR" in output:
+            response["ERROR"] = output["ERROR"]
+        stats_service.handle_error_response(response)
+        current_branch = await repo_service.get_current_branch()
+        data = {"branches": output["branches"], "branch": current_branch, "command": " ".join(command), "repo": config.repo_path_str}
     response.update({"DATA": data})
-    return stats_service.create_success_response(response)
+    return stats_service.create_revalidatable_response(response, if_none_match)
 
 
 @app.get("/current_branch", tags=["Branch Management"])
 async def get_current_branch(
+    repo: str = None,
     stats_service: GitStatsService = Depends(get_stats_service),
     config: GitStatsConfig = Depends(get_config),
     repo_service: GitRepositoryService = Depends(get_repo_service),
 ):
     """Return the branch that the repository is currently set to."""
-    stats_service.validate_repo_path()
-
     response = stats_service.create_response("/current_branch")
 
-    if config.branch:
-        data = {"branch": config.branch, "repo": str(config.repo_path)}
-        response.update({"DATA": data})
-        return stats_service.create_success_response(response)
-
-    command = config.repo_command + ["branch", "--show-current"]
-    output = stats_service.executor.execute(command)
-    output.update({"REQUEST_PATH": "/current_branch"})
-    stats_service.handle_error_response(output)
-
-    current_branch = output.get("command_output", "").strip()
-    data = {"branch": current_branch, "repo": str(config.repo_path)}
+    async with config.using_repo(repo):
+        stats_service.validate_repo_path()
+        if config.branch:
+            data = {"branch": config.branch, "repo": config.repo_path_str}
+            response.update({"DATA": data})
+            return stats_service.create_success_response(response)
+
+        current_branch = repo_service.read_head_branch()
+        if current_branch is None:
+            command = [*config.repo_command, "branch", "--show-current"]
+            output = await repo_service.execute_cached(command)
+            output.update({"REQUEST_PATH": "/current_branch"})
+            stats_service.handle_error_response(output)
+            current_branch = output.get("command_output", "").strip()
+        data = {"branch": current_branch, "repo": config.repo_path_str}
     response.update({"DATA": data})
     return stats_service.create_success_response(response)
 
@@ -520,7 +1230,7 @@ async def get_current_branch_internal(stats_service: GitStatsService = Depends(g
     stats_service.validate_repo_path()
 
     response = stats_service.create_response("/current_branch_internal")
-    data = {"branch": config.branch, "repo": str(config.repo_path)}
+    data = {"branch": config.branch, "repo": config.repo_path_str}
     response["DATA"] = data
     return stats_service.create_success_response(response)
 
@@ -534,51 +1244,42 @@ async def get_commit_statistics(
     repo_service: GitRepositoryService = Depends(get_repo_service),
 ):
     """Get commit statistics (optionally filtered by author, branch, and date range)."""
-    if not params.repo and not config.repo_path:
-        stats_service.validate_repo_path()
-
     response = stats_service.create_response("/commit_statistics")
 
-    if params.repo:
-        config.set_repo_path(params.repo)
-
-    command = config.log_stat_command.copy()
-    if params.author:
-        command.append(f"--author={params.author}")
-    if params.after:
-        command.append(f"--after={params.after}")
-    if params.before:
-        command.append(f"--before={params.before}")
-    if params.branch:
-        stats_service.validate_branch(params.branch)
-        logger.debug(f"Using branch: {params.branch}")
-        command.append(params.branch)
-    elif config.branch:
-        logger.debug(f"Using previously-set branch: {config.branch}")
-        command.append(config.branch)
+    async with config.using_repo(params.repo):
+        stats_service.validate_repo_path()
 
-    logger.debug(f"git_commit_statistics(): command: {' '.join(command)}")
+        filters = [f"--{name}={value}" for name, value in (("author", params.author), ("after", params.after), ("before", params.before)) if value]
+        command = [*config.log_stat_command, *filters]
+        # A revision that looks like an option (e.g. "--output=<file>") must not be parsed as one
+        if params.branch:
+            logger.debug("Using branch: %s", params.branch)
+            command.extend(("--end-of-options", params.branch))
+        elif config.branch:
+            logger.debug("Using previously-set branch: %s", config.branch)
+            command.extend(("--end-of-options", config.branch))
+
+        if logger.is_debug_enabled():
+            logger.debug("git_commit_statistics(): command: %s", " ".join(command))
+
+        if params.branch:
+            branch = params.branch
+            # Validate the branch before git sees it; the branch list is usually memoized, so this rarely runs git
+            await stats_service.validate_branch(params.branch)
+            stats = await stats_service.get_commit_statistics(command)
+        else:
+            # The current branch lookup doesn't depend on the log, so run both concurrently
+            stats, branch = await asyncio.gather(stats_service.get_commit_statistics(command), repo_service.get_current_branch())
+        repo_path_str = config.repo_path_str
 
-    response.update(stats_service.executor.execute(command))
+    if "ERROR" in stats:
+        response["ERROR"] = stats["ERROR"]
     stats_service.handle_error_response(response)
 
-    command_output = response.get("command_output", "")
-
-    files = 0
-    insertions = 0
-    deletions = 0
-    for line in command_output.splitlines():
-        match = re.search(r"^\s*(\d+)\s*file.* changed.*?$", line)
-        if match:
-            files += int(match.group(1))
-        match = re.search(r"^.*?(\d+)\s*insertions.*?$", line)
-        if match:
-            insertions += int(match.group(1))
-        match = re.search(r"^.*?(\d+)\s*deletions.*?$", line)
-        if match:
-            deletions += int(match.group(1))
-
-    logger.debug(f"Files changed: {files}, Insertions: {insertions}, Deletions: {deletions}")
+    files = stats["files"]
+    insertions = stats["insertions"]
+    deletions = stats["deletions"]
+    logger.debug("Files changed: %d, Insertions: %d, Deletions: %d", files, insertions, deletions)
 
     data = {
         "commit_statistics": {
@@ -590,8 +1291,8 @@ async def get_commit_statistics(
             "before": params.before if params.before else None,
             "command": " ".join(command),
         },
-        "repo": str(config.repo_path),
-        "branch": params.branch if params.branch else repo_service.get_current_branch(),
+        "repo": repo_path_str,
+        "branch": branch,
     }
     response.update({"DATA": data})
     return stats_service.create_success_response(response)
@@ -600,24 +1301,33 @@ async def get_commit_statistics(
 @app.post("/set_branch", tags=["Branch Management"])
 async def set_current_branch(
     branch: str = None,
+    validate: bool = False,
     stats_service: GitStatsService = Depends(get_stats_service),
     config: GitStatsConfig = Depends(get_config),
     logger: GitStatsLogger = Depends(get_logger),
     repo_service: GitRepositoryService = Depends(get_repo_service),
 ):
-    """Set the branch that will be queried by the application."""
-    stats_service.validate_repo_path()
+    """Set the branch that will be queried by the application.
+
+    With `validate=true`, an unknown branch is rejected with a 404 rather than an `error` message.
+    """
+    # Held across the existence check, so the repository can't change before the branch is set
+    async with config.changing():
+        stats_service.validate_repo_path()
 
-    if not branch:
-        config.branch = None
-    elif not repo_service.is_branch_in_repo(branch):
-        return {"error": f"Branch '{branch}' does not exist in the repository {config.repo_path}"}
+        if branch and not await repo_service.is_branch_in_repo(branch):
+            message = f"Branch '{branch}' does not exist in the repository {config.repo_path}"
+            if validate:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=message)
+            return {"error": message}
 
-    logger.debug(f"Setting current branch to: {branch}")
-    config.branch = branch
+        logger.debug("Setting current branch to: %s", branch)
+        config.branch = branch or None
+        config.clear_branch_cache()
+        repo_service.cache.clear()
+        data = {"branch": config.branch, "repo": config.repo_path_str}
 
     response = stats_service.create_response("/branch", "POST")
-    data = {"branch": config.branch, "repo": str(config.repo_path)}
     response.update({"DATA": data})
     return stats_service.create_success_response(response)
 
@@ -625,20 +1335,47 @@ async def set_current_branch(
 @app.post("/set_repo", tags=["Repository Management"])
 async def set_current_repo(
     repo: str = None,
+    body: Annotated[Union[SetRepoBody, None], Body()] = None,
     stats_service: GitStatsService = Depends(get_stats_service),
     config: GitStatsConfig = Depends(get_config),
     logger: GitStatsLogger = Depends(get_logger),
+    repo_service: GitRepositoryService = Depends(get_repo_service),
 ):
-    """Set the path to the repository that will be queried."""
+    """Set the path to the repository that will be queried.
+
+    The path may be given as a `repo` query parameter or in a JSON body, e.g. `{"repo": "/path/to/repo"}`.
+    """
+    # A JSON body spares long paths from percent-encoding and URL length limits
+    if body is not None and body.repo:
+        repo = body.repo
     response = stats_service.create_response("/set_repo", "POST")
     response["DATA"] = {"repo": repo}
 
-    if not repo:
-        config.repo_path = None
-        return stats_service.create_success_response(response)
+    async with config.changing():
+        repo_service.cache.clear()
+
+        if not repo:
+            config.clear_repo_path()
+            return stats_service.create_success_response(response)
+
+        await config.set_repo_path(repo=repo)
+        logger.debug("Set repo_path to: %s", config.repo_path)
+
+        response["DATA"]["repo"] = config.repo_path_str
+    return stats_service.create_success_response(response)
 
-    config.set_repo_path(repo=repo)
-    logger.debug(f"Set repo_path to: {config.repo_path}")
 
-    response["DATA"]["repo"] = str(config.repo_path)
+@app.post("/clear_cache", tags=["Repository Management"])
+async def clear_cache(
+    stats_service: GitStatsService = Depends(get_stats_service),
+    config: GitStatsConfig = Depends(get_config),
+    repo_service: GitRepositoryService = Depends(get_repo_service),
+):
+    """Drop all cached git output, e.g. after changing the repository in a way the refs don't reflect."""
+    response = stats_service.create_response("/clear_cache", "POST")
+    # Wait for in-flight requests, which could otherwise store output read before the clear
+    async with config.changing():
+        repo_service.cache.clear()
+        config.clear_branch_cache()
+        response["DATA"] = {"repo": config.repo_path_str}
     return stats_service.create_success_response(response)
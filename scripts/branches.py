@@ -14,190 +14,113 @@ Examples:
     python branches_example.py --repo /path/to/repo
     python branches_example.py --format table
     python branches_example.py --api-url http://localhost:8080
+
+When run without arguments, the settings are read from the GITSTATS_REPO,
+GITSTATS_API_URL and GITSTATS_FORMAT environment variables instead, which
+skips building the argument parser.
 """
 import argparse
-import json
 import sys
 from os import environ
-from pathlib import Path
-from typing import Optional, List
-
-import requests
-from requests import RequestException
-
+from types import SimpleNamespace
+from typing import List
 
-class GitStatsClient:
-    """Client for interacting with the GitStats API."""
-    
-    def __init__(self, api_url: str = "http://127.0.0.1:8000"):
-        self.api_url = api_url.rstrip('/')
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "User-Agent": "GitStats-Client/1.0"
-        })
-    
-    def set_repo_path(self, repo_path: str) -> dict:
-        """Set the repository path in the API."""
-        try:
-            response = self.session.post(
-                f"{self.api_url}/set_repo",
-                params={"repo": repo_path},
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RequestException(f"Failed to set repository path: {e}")
-    
-    def get_branches(self, repo_path: Optional[str] = None) -> dict:
-        """Get branches list from the API."""
-        try:
-            # Set repo path if provided
-            if repo_path:
-                self.set_repo_path(repo_path)
-            
-            response = self.session.get(
-                f"{self.api_url}/branches",
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RequestException(f"Failed to get branches: {e}")
-    
-    def get_current_branch(self, repo_path: Optional[str] = None) -> dict:
-        """Get current branch from the API."""
-        try:
-            # Set repo path if provided
-            if repo_path:
-                self.set_repo_path(repo_path)
-            
-            response = self.session.get(
-                f"{self.api_url}/current_branch",
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RequestException(f"Failed to get current branch: {e}")
+# Output fragments shared by every row, built once at import
+_MARK_CURRENT, _MARK_OTHER = "📍 CURRENT", "  "
+_MARK_CURRENT_LIST, _MARK_OTHER_LIST = "📍 ", "   "
+_HEADER_TABLE = "🌿 Repository Branches\n" + "=" * 50
+_HEADER_LIST = "🌿 Repository Branches\n" + "=" * 30
 
 
-def validate_repo_path(repo_path: str) -> Path:
-    """Validate that the repository path exists and is a directory."""
-    path = Path(repo_path).expanduser().resolve()
-    if not path.exists():
-        raise ValueError(f"Repository path does not exist: {path}")
-    if not path.is_dir():
-        raise ValueError(f"Repository path is not a directory: {path}")
-    if not (path / ".git").exists():
-        raise ValueError(f"Not a git repository (no .git directory found): {path}")
-    return path
+def sort_branches(branches: List[str], current_branch: str) -> List[str]:
+    """Sort branches alphabetically with the current branch first."""
+    return sorted(branches, key=lambda branch: (branch != current_branch, branch))
 
 
-def format_branches_table(branches: List[str], current_branch: str) -> str:
+def format_branches_table(branches: List[str], current_branch: str, presorted: bool = False) -> str:
     """Format branches as a nice table."""
     if not branches:
         return "No branches found."
     
-    output = []
-    output.append("🌿 Repository Branches")
-    output.append("=" * 50)
-    
     # Calculate max width for alignment
-    max_width = max(len(branch) for branch in branches) if branches else 10
+    max_width = max(map(len, branches), default=10)
     header_width = max(max_width, 15)
     
-    # Header
-    output.append(f"{'Branch Name':<{header_width}} | Status")
-    output.append("-" * (header_width + 10))
+    header = [
+        _HEADER_TABLE,
+        f"{'Branch Name':<{header_width}} | Status",
+        "-" * (header_width + 10),
+    ]
     
-    # Sort branches with current branch first
-    sorted_branches = sorted(branches)
-    if current_branch and current_branch in sorted_branches:
-        sorted_branches.remove(current_branch)
-        sorted_branches.insert(0, current_branch)
+    # Sort branches with current branch first, unless the caller already did
+    sorted_branches = branches if presorted else sort_branches(branches, current_branch)
     
-    # Branch list
-    for branch in sorted_branches:
-        status = "📍 CURRENT" if branch == current_branch else "  "
-        output.append(f"{branch:<{header_width}} | {status}")
+    # Branch list, joined straight from the rows; the row format only depends on the column width, so build it once
+    row = f"{{:<{header_width}}} | {{}}".format
+    body = "\n".join(row(branch, _MARK_CURRENT if branch == current_branch else _MARK_OTHER) for branch in sorted_branches)
     
-    output.append("")
-    output.append(f"Total branches: {len(branches)}")
+    footer = ["", f"Total branches: {len(branches)}"]
     if current_branch:
-        output.append(f"Current branch: {current_branch}")
+        footer.append(f"Current branch: {current_branch}")
     
-    return "\n".join(output)
+    return "\n".join([*header, body, *footer])
 
 
-def format_branches_list(branches: List[str], current_branch: str) -> str:
+def format_branches_list(branches: List[str], current_branch: str, presorted: bool = False) -> str:
     """Format branches as a simple list."""
     if not branches:
         return "No branches found."
     
-    output = []
-    output.append("🌿 Repository Branches")
-    output.append("=" * 30)
-    
-    # Sort branches with current branch first
-    sorted_branches = sorted(branches)
-    if current_branch and current_branch in sorted_branches:
-        sorted_branches.remove(current_branch)
-        sorted_branches.insert(0, current_branch)
-    
-    for branch in sorted_branches:
-        if branch == current_branch:
-            output.append(f"📍 {branch} (current)")
-        else:
-            output.append(f"   {branch}")
+    # Sort branches with current branch first, unless the caller already did
+    sorted_branches = branches if presorted else sort_branches(branches, current_branch)
     
-    output.append("")
-    output.append(f"Total: {len(branches)} branches")
+    body = "\n".join(f"{_MARK_CURRENT_LIST}{branch} (current)" if branch == current_branch else _MARK_OTHER_LIST + branch for branch in sorted_branches)
     
-    return "\n".join(output)
+    return "\n".join([_HEADER_LIST, body, "", f"Total: {len(branches)} branches"])
 
 
 def format_output(response: dict, format_type: str = "summary", verbose: bool = False) -> str:
     """Format the API response for display."""
+    from client import dumps_json
+    
+    if response.get("STATUS_CODE") != 200:
+        # Error response
+        return "\n".join(["❌ Error Response", "=" * 50, dumps_json(response)])
+    
+    # A successful response always carries these keys
+    data = response["DATA"]
+    branches = data["branches"]
+    current_branch = data["branch"]
+    repo = data["repo"]
+    
+    # Sort once and hand the same list to whichever formatter runs
+    sorted_branches = sort_branches(branches, current_branch)
+    
     output = []
     
-    if response.get("STATUS_CODE") == 200:
-        data = response.get("DATA", {})
-        branches = data.get("branches", [])
-        current_branch = data.get("branch", "")
-        repo = data.get("repo", "unknown")
+    if format_type == "table":
+        output.append(f"📁 Repository: {repo}")
+        output.append("")
+        output.append(format_branches_table(sorted_branches, current_branch, presorted=True))
+    elif format_type == "list":
+        output.append(f"📁 Repository: {repo}")
+        output.append("")
+        output.append(format_branches_list(sorted_branches, current_branch, presorted=True))
+    else:  # summary
+        output.append("🌿 Branch Summary")
+        output.append("=" * 40)
+        output.append(f"Repository: {repo}")
+        output.append(f"Current branch: {current_branch or '(none)'}")
+        output.append(f"Total branches: {len(branches)}")
         
-        if format_type == "table":
-            output.append(f"📁 Repository: {repo}")
-            output.append("")
-            output.append(format_branches_table(branches, current_branch))
-        elif format_type == "list":
-            output.append(f"📁 Repository: {repo}")
-            output.append("")
-            output.append(format_branches_list(branches, current_branch))
-        else:  # summary
-            output.append("🌿 Branch Summary")
-            output.append("=" * 40)
-            output.append(f"Repository: {repo}")
-            output.append(f"Current branch: {current_branch or '(none)'}")
-            output.append(f"Total branches: {len(branches)}")
-            
-            if branches:
-                output.append("\nBranches:")
-                for branch in sorted(branches):
-                    marker = "📍" if branch == current_branch else "  "
-                    output.append(f"  {marker} {branch}")
-        
-        if verbose:
-            output.append("\n" + "=" * 50)
-            output.append("📋 Full API Response:")
-            output.append(json.dumps(response, indent=2))
-    else:
-        # Error response
-        output.append("❌ Error Response")
-        output.append("=" * 50)
-        output.append(json.dumps(response, indent=2))
+        if branches:
+            output.append("\nBranches:")
+            output.extend(f"  {_MARK_CURRENT_LIST if branch == current_branch else _MARK_OTHER_LIST}{branch}" for branch in sorted_branches)
+    
+    if verbose:
+        output.append("\n" + "=" * 50)
+        output.append("📋 Full API Response:")
+        output.append(dumps_json(response))
     
     return "\n".join(output)
 
@@ -265,16 +188,36 @@ Examples:
     return parser.parse_args()
 
 
+def arguments_from_environment() -> SimpleNamespace:
+    """Build the same settings parse_arguments returns from environment variables, using the argparse defaults."""
+    return SimpleNamespace(
+        repo=environ.get("GITSTATS_REPO"),
+        api_url=environ.get("GITSTATS_API_URL", "http://127.0.0.1:8000"),
+        format=environ.get("GITSTATS_FORMAT", "summary"),
+        verbose=False,
+        json_only=False,
+        current_only=False,
+        count_only=False,
+    )
+
+
 def main():
     """Main function."""
+    # Scripts run bare in shell loops are startup-bound, so skip argparse when there is nothing to parse.
+    # Parse before importing the client: requests takes longer to import than the rest of the script,
+    # and --help or a usage error exits without needing it
+    args = arguments_from_environment() if len(sys.argv) == 1 else parse_arguments()
+    
+    from requests import RequestException
+    
+    from client import DEFAULT_REPO_PATH, dumps_json, get_client, is_local_api, validate_repo_path
+    
     try:
-        args = parse_arguments()
-        
         # Determine repository path
-        repo_path = args.repo or f"{environ.get('HOME', '.')}/repos/gitstats"
+        repo_path = args.repo or DEFAULT_REPO_PATH
         
-        # Validate repository path if provided
-        if repo_path:
+        # Validate repository path if provided; a remote API's paths don't exist here, so leave those to the server
+        if repo_path and is_local_api(args.api_url):
             try:
                 validated_path = validate_repo_path(repo_path)
                 repo_path = str(validated_path)
@@ -283,7 +226,7 @@ def main():
                 sys.exit(1)
         
         # Create client
-        client = GitStatsClient(args.api_url)
+        client = get_client(args.api_url)
         
         print(f"🔍 Fetching branch information from {args.api_url}...")
         if repo_path:
@@ -295,7 +238,7 @@ def main():
             response = client.get_current_branch(repo_path)
             
             if args.json_only:
-                print(json.dumps(response, indent=2))
+                print(dumps_json(response))
             elif response.get("STATUS_CODE") == 200:
                 data = response.get("DATA", {})
                 current_branch = data.get("branch", "unknown")
@@ -306,12 +249,12 @@ def main():
                 print(f"Current branch: {current_branch}")
             else:
                 print("❌ Failed to get current branch information")
-                print(json.dumps(response, indent=2))
+                print(dumps_json(response))
         else:
             response = client.get_branches(repo_path)
             
             if args.json_only:
-                print(json.dumps(response, indent=2))
+                print(dumps_json(response))
             elif args.count_only and response.get("STATUS_CODE") == 200:
                 data = response.get("DATA", {})
                 branches = data.get("branches", [])
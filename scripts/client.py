@@ -0,0 +1,476 @@
+# coding: utf-8
+"""
+Client for the GitStats API, shared by the example scripts.
+"""
+import copy
+import hashlib
+import json
+import os
+import re
+import stat
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from os import environ
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests import RequestException
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; without it JSON is parsed and printed with the standard json module
+    orjson = None
+
+
+def loads_json(response: requests.Response) -> dict:
+    """Parse the JSON body of an API response, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    # json.loads detects the UTF encoding of bytes itself, so the body needn't be decoded to text first
+    return json.loads(response.content)
+
+
+def dumps_json(obj) -> str:
+    """Serialize obj as indented JSON for display, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+# Path.home() also works where HOME isn't set, e.g. on Windows
+DEFAULT_REPO_PATH = str(Path.home() / "repos" / "gitstats")
+
+# Where responses to /commit_statistics are kept between runs
+STATS_CACHE_DIR = Path(environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "gitstats"
+
+# Common date formats to try
+_DATE_FORMATS = (
+    "%Y-%m-%d",      # 2024-01-01
+    "%m/%d/%Y",      # 01/01/2024
+    "%d/%m/%Y",      # 01/01/2024
+    "%Y-%m-%d %H:%M:%S",  # 2024-01-01 10:30:00
+)
+# Strings shaped like one of _DATE_FORMATS; only these are worth the (slow) strptime check
+_DATE_RE = re.compile(r"\d{4}-\d{1,2}-\d{1,2}(?: \d{1,2}:\d{1,2}:\d{1,2})?|\d{1,2}/\d{1,2}/\d{4}")
+# Relative dates (git understands these), matched anywhere in the date regardless of case
+_RELATIVE_DATE_RE = re.compile("|".join(map(re.escape, (
+    "today", "yesterday", "last week", "last month", "last year",
+    "1 week ago", "2 weeks ago", "1 month ago", "3 months ago", "1 year ago"
+))), re.IGNORECASE)
+
+# (connect, read) timeouts in seconds: give up quickly on an unreachable server, but let slow git queries finish;
+# commit statistics walk every matching commit's diff, so they get longer to read
+_TIMEOUT = (3.05, 27)
+_STATS_TIMEOUT = (3.05, 60)
+
+
+def create_session(pool_maxsize: int = 16) -> requests.Session:
+    """Create a session for the GitStats API, shared by every script's client."""
+    session = requests.Session()
+    # requests sets Content-Type itself for requests sent with json=
+    session.headers.update({"User-Agent": "GitStats-Client/1.0"})
+    # Keep connections to the API open across calls, and retry requests that fail because
+    # the server is (re)starting; every endpoint, including the POSTs, is safe to repeat
+    retry = Retry(
+        total=3,
+        connect=2,
+        read=1,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET", "POST"])
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class GitStatsClient:
+    """Client for interacting with the GitStats API."""
+    
+    def __init__(
+        self,
+        api_url: str = "http://127.0.0.1:8000",
+        cache_ttl: float = 30.0,
+        stats_cache_dir: Optional[Path] = STATS_CACHE_DIR,
+        stats_cache_ttl: float = 300.0
+    ):
+        self.api_url = api_url.rstrip('/')
+        self.session = create_session()
+        # Repository most recently set via /set_repo, and the API's response to it
+        self._current_repo: Optional[str] = None
+        self._set_repo_response: Optional[dict] = None
+        # Recent responses, keyed by endpoint and arguments; branches and commit counts change at commit cadence,
+        # so callers polling in a loop needn't hit the API every time
+        self.cache_ttl = cache_ttl
+        self._cache: Dict[tuple, Tuple[float, dict]] = {}
+        # Commit statistics responses can also be cached on disk, so repeated runs with the same filters
+        # skip the API and the git log behind it
+        self.stats_cache_dir = stats_cache_dir
+        self.stats_cache_ttl = stats_cache_ttl
+        # (ETag, body) of earlier responses to endpoints that send ETags, keyed by endpoint and query parameters
+        self._etag_cache: Dict[tuple, Tuple[str, dict]] = {}
+    
+    def _get_cached(self, key: tuple) -> Optional[dict]:
+        """Return a copy of the cached response for key, or None if there is none or it has expired."""
+        entry = self._cache.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.cache_ttl:
+            return None
+        return copy.deepcopy(entry[1])
+    
+    def _set_cached(self, key: tuple, response: dict) -> dict:
+        """Cache a copy of response under key and return response."""
+        self._cache[key] = (time.monotonic(), copy.deepcopy(response))
+        return response
+    
+    def _get_revalidated(self, endpoint: str, params: dict, timeout=_TIMEOUT) -> dict:
+        """GET endpoint, revalidating an earlier response by its ETag rather than downloading it again."""
+        key = (endpoint, tuple(sorted(params.items())))
+        cached = self._etag_cache.get(key)
+        response = self.session.get(
+            f"{self.api_url}{endpoint}",
+            params=params,
+            headers={"If-None-Match": cached[0]} if cached else None,
+            timeout=timeout
+        )
+        if response.status_code == 304:
+            return copy.deepcopy(cached[1])
+        response.raise_for_status()
+        body = loads_json(response)
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etag_cache[key] = (etag, copy.deepcopy(body))
+        return body
+    
+    def _stats_cache_path(self, key: tuple) -> Path:
+        """Return the disk cache file for key."""
+        return self.stats_cache_dir / f"{hashlib.sha256(repr(key).encode()).hexdigest()}.json"
+    
+    def _read_stats_cache(self, key: tuple) -> Optional[dict]:
+        """Return the response cached on disk for key, or None if there is none or it has expired."""
+        path = self._stats_cache_path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.stats_cache_ttl:
+                return None
+            return json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+    
+    def _write_stats_cache(self, key: tuple, response: dict) -> None:
+        """Cache response on disk under key; the cache is best effort, so failures are ignored."""
+        path = self._stats_cache_path(key)
+        try:
+            self.stats_cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write then rename so a concurrent run never reads a partial file
+            temp_path = path.with_suffix(".tmp")
+            temp_path.write_text(json.dumps(response))
+            temp_path.replace(path)
+        except OSError:
+            pass
+    
+    def invalidate_repo_cache(self) -> None:
+        """Forget which repository was last set, so the next set_repo_path call always reaches the API.
+
+        Useful when something else (another client, a server restart) may have changed the API's repository.
+        """
+        self._current_repo = None
+        self._set_repo_response = None
+    
+    def _track_repo(self, repo_path: Optional[str]) -> None:
+        """Forget the repository set_repo_path last set if a request is about to switch the API to another one."""
+        if repo_path and repo_path != self._current_repo:
+            self.invalidate_repo_cache()
+    
+    def set_repo_path(self, repo_path: str) -> dict:
+        """Set the repository path in the API, skipping the request if it is already set."""
+        if repo_path == self._current_repo:
+            return self._set_repo_response
+        try:
+            response = self.session.post(
+                f"{self.api_url}/set_repo",
+                json={"repo": repo_path},
+                timeout=_TIMEOUT
+            )
+            response.raise_for_status()
+            self._set_repo_response = loads_json(response)
+            self._current_repo = repo_path
+            return self._set_repo_response
+        except requests.RequestException as e:
+            raise RequestException(f"Failed to set repository path: {e}")
+    
+    def get_branches(self, repo_path: Optional[str] = None, refresh: bool = False) -> dict:
+        """Get branches list from the API, reusing a recent response unless refresh is set.
+
+        Past that, the last response is revalidated by its ETag, so an unchanged list isn't downloaded again.
+        """
+        key = ("/branches", repo_path)
+        if not refresh:
+            cached = self._get_cached(key)
+            if cached is not None:
+                return cached
+        try:
+            # Passing the repo here saves a separate /set_repo request
+            params = {"repo": repo_path} if repo_path else {}
+            self._track_repo(repo_path)
+            
+            return self._set_cached(key, self._get_revalidated("/branches", params))
+        except requests.RequestException as e:
+            raise RequestException(f"Failed to get branches: {e}")
+    
+    def get_current_branch(self, repo_path: Optional[str] = None) -> dict:
+        """Get current branch from the API."""
+        try:
+            # Passing the repo here saves a separate /set_repo request
+            params = {"repo": repo_path} if repo_path else {}
+            self._track_repo(repo_path)
+            
+            response = self.session.get(
+                f"{self.api_url}/current_branch",
+                params=params,
+                timeout=_TIMEOUT
+            )
+            response.raise_for_status()
+            return loads_json(response)
+        except requests.RequestException as e:
+            raise RequestException(f"Failed to get current branch: {e}")
+    
+    def get_commit_count(self, repo_path: Optional[str] = None, branch: Optional[str] = None, refresh: bool = False) -> dict:
+        """Get commit count from the API, reusing a recent response unless refresh is set."""
+        key = ("/commit_count", repo_path, branch)
+        if not refresh:
+            cached = self._get_cached(key)
+            if cached is not None:
+                return cached
+        try:
+            # Passing the repo here saves a separate /set_repo request; requests leaves out parameters that are None
+            params = {"repo": repo_path or None, "branch": branch or None}
+            self._track_repo(repo_path)
+            
+            response = self.session.get(
+                f"{self.api_url}/commit_count",
+                params=params,
+                timeout=_TIMEOUT
+            )
+            response.raise_for_status()
+            return self._set_cached(key, loads_json(response))
+        except requests.RequestException as e:
+            raise RequestException(f"Failed to get commit count: {e}")
+    
+    def get_commit_statistics(
+        self,
+        repo_path: Optional[str] = None,
+        branch: Optional[str] = None,
+        author: Optional[str] = None,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        refresh: bool = False,
+        disk_cache: bool = False
+    ) -> dict:
+        """Get commit statistics from the API.
+
+        With disk_cache set, a response cached on disk by an earlier run is reused unless refresh is set.
+        Callers should only set it with an explicit branch and absolute dates (or none): a relative date like
+        "1 week ago" means something different on every run, and without a branch the server uses whatever
+        branch it was last set to.
+        """
+        key = (self.api_url, repo_path, branch, author, after, before)
+        disk_cache = disk_cache and self.stats_cache_dir is not None
+        if disk_cache and not refresh:
+            cached = self._read_stats_cache(key)
+            if cached is not None:
+                return cached
+        try:
+            # Build query parameters from the filters that are set; passing the repo here saves a separate /set_repo request
+            filters = (("repo", repo_path), ("branch", branch), ("author", author), ("after", after), ("before", before))
+            params = {name: value for name, value in filters if value}
+            self._track_repo(repo_path)
+            
+            response = self.session.get(
+                f"{self.api_url}/commit_statistics",
+                params=params,
+                timeout=_STATS_TIMEOUT
+            )
+            response.raise_for_status()
+            result = loads_json(response)
+        except requests.RequestException as e:
+            raise RequestException(f"Failed to get commit statistics: {e}")
+        if disk_cache:
+            self._write_stats_cache(key, result)
+        return result
+    
+    def get_top_authors(
+        self,
+        repo_path: Optional[str] = None,
+        branch: Optional[str] = None,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        limit: int = 10,
+        min_commits: int = 1
+    ) -> dict:
+        """Get top authors from the API, optionally only those with at least min_commits commits."""
+        try:
+            # Build query parameters from the filters that are set; passing the repo here saves a separate /set_repo request
+            filters = (("repo", repo_path), ("branch", branch), ("after", after), ("before", before))
+            params = {name: value for name, value in filters if value}
+            params["limit"] = limit
+            if min_commits > 1:
+                params["min_commits"] = min_commits
+            self._track_repo(repo_path)
+            
+            return self._get_revalidated("/top_authors", params, timeout=_STATS_TIMEOUT)
+        except requests.RequestException as e:
+            raise RequestException(f"Failed to get top authors: {e}")
+    
+    def get_top_authors_batch(self, queries: List[dict], repo_path: Optional[str] = None) -> dict:
+        """Get top authors for several queries (dicts of /top_authors parameters) in one request.
+
+        repo_path, if given, is sent with every query that doesn't name a repository itself,
+        which saves a separate /set_repo request.
+        """
+        try:
+            if repo_path:
+                queries = [{"repo": repo_path, **query} for query in queries]
+                self._track_repo(repo_path)
+            
+            response = self.session.post(
+                f"{self.api_url}/top_authors_batch",
+                json=queries,
+                timeout=_STATS_TIMEOUT
+            )
+            response.raise_for_status()
+            return loads_json(response)
+        except requests.RequestException as e:
+            raise RequestException(f"Failed to get top authors: {e}")
+    
+    def get_commit_counts(self, repo_path: Optional[str], branches: List[str]) -> List[dict]:
+        """Get commit counts for several branches concurrently, in the order the branches are given."""
+        # Each request carries the same repo and its own branch, so they can safely overlap;
+        # the session's connection pool lets each worker reuse an open connection
+        with ThreadPoolExecutor(max_workers=min(len(branches), 8)) as executor:
+            return list(executor.map(lambda branch: self.get_commit_count(repo_path, branch), branches))
+
+
+def is_local_api(api_url: str) -> bool:
+    """Return True if api_url points at this machine, where the repository path can be checked before calling the API."""
+    return urlparse(api_url).hostname in ("127.0.0.1", "localhost", "::1")
+
+
+def fetch_while_validating_branch(client: GitStatsClient, repo_path: Optional[str], branch: str, fetch: Callable[[], dict]) -> Future:
+    """Start fetch in the background, then check that branch exists, exiting with status 1 if it doesn't.
+
+    Both requests name the repo, so the fetch needn't wait for the check; if the branch is missing, the server
+    rejects the fetch straight away. fetch runs in a daemon thread rather than a ThreadPoolExecutor, whose
+    workers the interpreter joins at exit, so exiting on a missing branch never waits for the fetch.
+
+    Returns:
+        A future holding fetch's result
+    """
+    future: Future = Future()
+    
+    def run():
+        try:
+            future.set_result(fetch())
+        except BaseException as e:  # pylint: disable=broad-except
+            future.set_exception(e)
+    
+    threading.Thread(target=run, daemon=True).start()
+    
+    print(f"🔍 Validating branch '{branch}'...")
+    try:
+        branches_response = client.get_branches(repo_path)
+        if branches_response.get("STATUS_CODE") == 200:
+            available_branches = branches_response.get("DATA", {}).get("branches", [])
+            if branch not in available_branches:
+                print(f"❌ Branch '{branch}' not found.", file=sys.stderr)
+                print(f"Available branches: {', '.join(available_branches)}", file=sys.stderr)
+                sys.exit(1)
+            print(f"✅ Branch '{branch}' found.")
+    except RequestException as e:
+        print(f"⚠️  Could not validate branch: {e}", file=sys.stderr)
+    return future
+
+
+@lru_cache(maxsize=256)
+def validate_repo_path(repo_path: str) -> Path:
+    """Validate that the repository path exists and is a directory."""
+    path = Path(repo_path).expanduser()
+    if not path.is_absolute():
+        path = path.resolve()
+    # A .git entry implies the path is an existing directory, so the common case needs one stat;
+    # the individual checks below only run to explain a failure
+    if (path / ".git").exists():
+        return path
+    # Otherwise one stat of the path tells the failures apart
+    try:
+        path_stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise ValueError(f"Repository path does not exist: {path}")
+    if not stat.S_ISDIR(path_stat.st_mode):
+        raise ValueError(f"Repository path is not a directory: {path}")
+    raise ValueError(f"Not a git repository (no .git directory found): {path}")
+
+
+def _warn_date_format(date_string: str) -> None:
+    """Warn that date_string may not be understood by git, and suggest formats that are."""
+    print(f"⚠️  Warning: Date format '{date_string}' may not be recognized.")
+    print("   Suggested formats:")
+    print("   - YYYY-MM-DD (e.g., 2024-01-01)")
+    print("   - Relative dates (e.g., '1 week ago', 'yesterday', 'last month')")
+    print()
+
+
+@lru_cache(maxsize=256)
+def validate_date_format(date_string: str) -> str:
+    """Validate and suggest corrections for date formats.
+
+    Results are cached, so the warning for an unrecognized date is printed once per date.
+    """
+    if not date_string:
+        return date_string
+    
+    # Try to parse as standard date
+    if _DATE_RE.fullmatch(date_string):
+        from datetime import datetime
+        
+        # ISO dates are the common case, and fromisoformat parses them in C without a format string;
+        # strptime remains for the other formats and for unpadded ISO dates
+        if date_string[4:5] == "-":
+            try:
+                datetime.fromisoformat(date_string)
+                return date_string  # Valid format
+            except ValueError:
+                pass
+        
+        for fmt in _DATE_FORMATS:
+            try:
+                datetime.strptime(date_string, fmt)
+                return date_string  # Valid format
+            except ValueError:
+                continue
+    
+    if _RELATIVE_DATE_RE.search(date_string):
+        return date_string  # Likely valid relative date
+    
+    # If we get here, suggest common formats
+    _warn_date_format(date_string)
+    
+    return date_string
+
+
+def is_absolute_date(date_string: str) -> bool:
+    """Return True if date_string is shaped like one of the absolute date formats, rather than e.g. "1 week ago"."""
+    return _DATE_RE.fullmatch(date_string) is not None
+
+
+@lru_cache(maxsize=8)
+def get_client(api_url: str = "http://127.0.0.1:8000") -> GitStatsClient:
+    """Return the client for api_url, creating it on first use so its connections and cache are shared."""
+    return GitStatsClient(api_url)
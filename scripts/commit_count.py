@@ -14,104 +14,46 @@ Examples:
     python commit_count_example.py
     python commit_count_example.py --branch main
     python commit_count_example.py --repo /path/to/repo --branch dev
+    python commit_count_example.py --branches main,dev,feature-x
     python commit_count_example.py --api-url http://localhost:8080
+
+When run without arguments, the settings are read from the GITSTATS_REPO,
+GITSTATS_API_URL and GITSTATS_BRANCH environment variables instead, which
+skips building the argument parser.
 """
 import argparse
-import json
 import sys
 from os import environ
-from pathlib import Path
-from typing import Optional
-
-import requests
-from requests import RequestException
-
-
-class GitStatsClient:
-    """Client for interacting with the GitStats API."""
-    
-    def __init__(self, api_url: str = "http://127.0.0.1:8000"):
-        self.api_url = api_url.rstrip('/')
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "User-Agent": "GitStats-Client/1.0"
-        })
-    
-    def set_repo_path(self, repo_path: str) -> dict:
-        """Set the repository path in the API."""
-        try:
-            response = self.session.post(
-                f"{self.api_url}/set_repo",
-                params={"repo": repo_path},
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RequestException(f"Failed to set repository path: {e}")
-    
-    def get_commit_count(self, repo_path: Optional[str] = None, branch: Optional[str] = None) -> dict:
-        """Get commit count from the API."""
-        try:
-            # Set repo path if provided
-            if repo_path:
-                self.set_repo_path(repo_path)
-            
-            # Build query parameters
-            params = {}
-            if branch:
-                params["branch"] = branch
-            
-            response = self.session.get(
-                f"{self.api_url}/commit_count",
-                params=params,
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RequestException(f"Failed to get commit count: {e}")
-
-
-def validate_repo_path(repo_path: str) -> Path:
-    """Validate that the repository path exists and is a directory."""
-    path = Path(repo_path).expanduser().resolve()
-    if not path.exists():
-        raise ValueError(f"Repository path does not exist: {path}")
-    if not path.is_dir():
-        raise ValueError(f"Repository path is not a directory: {path}")
-    if not (path / ".git").exists():
-        raise ValueError(f"Not a git repository (no .git directory found): {path}")
-    return path
+from types import SimpleNamespace
 
 
 def format_output(response: dict, verbose: bool = False) -> str:
     """Format the API response for display."""
-    output = []
+    from client import dumps_json
     
-    if response.get("STATUS_CODE") == 200:
-        data = response.get("DATA", {})
-        commit_count = data.get("commit_count", 0)
-        branch_name = data.get("branch", "unknown")
-        repo = data.get("repo", "unknown")
-        
-        # Summary output
-        output.append("📊 Commit Count Summary")
-        output.append("=" * 50)
-        output.append(f"Repository: {repo}")
-        output.append(f"Branch: {branch_name or '(current)'}")
-        output.append(f"Total commits: {commit_count:,}")
-        
-        if verbose:
-            output.append("\n" + "=" * 50)
-            output.append("📋 Full API Response:")
-            output.append(json.dumps(response, indent=2))
-    else:
+    if response.get("STATUS_CODE") != 200:
         # Error response
-        output.append("❌ Error Response")
-        output.append("=" * 50)
-        output.append(json.dumps(response, indent=2))
+        return "\n".join(["❌ Error Response", "=" * 50, dumps_json(response)])
+    
+    # A successful response always carries these keys
+    data = response["DATA"]
+    commit_count = data["commit_count"]
+    branch_name = data["branch"]
+    repo = data["repo"]
+    
+    output = []
+    
+    # Summary output
+    output.append("📊 Commit Count Summary")
+    output.append("=" * 50)
+    output.append(f"Repository: {repo}")
+    output.append(f"Branch: {branch_name or '(current)'}")
+    output.append(f"Total commits: {commit_count:,}")
+    
+    if verbose:
+        output.append("\n" + "=" * 50)
+        output.append("📋 Full API Response:")
+        output.append(dumps_json(response))
     
     return "\n".join(output)
 
@@ -127,6 +69,7 @@ Examples:
   %(prog)s --branch main                      # Get count for main branch
   %(prog)s --repo /path/to/repo               # Use specific repository
   %(prog)s --repo /path/to/repo --branch dev  # Use specific repo and branch
+  %(prog)s --branches main,dev,feature-x      # Get counts for several branches at once
   %(prog)s --api-url http://localhost:8080    # Use different API URL
         """
     )
@@ -143,6 +86,12 @@ Examples:
         help="Branch name to get commit count for (default: current branch)"
     )
     
+    parser.add_argument(
+        "--branches",
+        type=str,
+        help="Comma-separated branch names to get commit counts for, queried concurrently"
+    )
+    
     parser.add_argument(
         "--api-url", "-u",
         type=str,
@@ -165,16 +114,35 @@ Examples:
     return parser.parse_args()
 
 
+def arguments_from_environment() -> SimpleNamespace:
+    """Build the same settings parse_arguments returns from environment variables, using the argparse defaults."""
+    return SimpleNamespace(
+        repo=environ.get("GITSTATS_REPO"),
+        branch=environ.get("GITSTATS_BRANCH"),
+        branches=None,
+        api_url=environ.get("GITSTATS_API_URL", "http://127.0.0.1:8000"),
+        verbose=False,
+        json_only=False,
+    )
+
+
 def main():
     """Main function."""
+    # Scripts run bare in shell loops are startup-bound, so skip argparse when there is nothing to parse.
+    # Parse before importing the client: requests takes longer to import than the rest of the script,
+    # and --help or a usage error exits without needing it
+    args = arguments_from_environment() if len(sys.argv) == 1 else parse_arguments()
+    
+    from requests import RequestException
+    
+    from client import DEFAULT_REPO_PATH, dumps_json, get_client, is_local_api, validate_repo_path
+    
     try:
-        args = parse_arguments()
-        
         # Determine repository path
-        repo_path = args.repo or f"{environ.get('HOME', '.')}/repos/gitstats"
+        repo_path = args.repo or DEFAULT_REPO_PATH
         
-        # Validate repository path if provided
-        if repo_path:
+        # Validate repository path if provided; a remote API's paths don't exist here, so leave those to the server
+        if repo_path and is_local_api(args.api_url):
             try:
                 validated_path = validate_repo_path(repo_path)
                 repo_path = str(validated_path)
@@ -183,20 +151,32 @@ def main():
                 sys.exit(1)
         
         # Create client and get commit count
-        client = GitStatsClient(args.api_url)
+        client = get_client(args.api_url)
+        
+        branches = [branch.strip() for branch in args.branches.split(",") if branch.strip()] if args.branches else []
         
         print(f"🔍 Fetching commit count from {args.api_url}...")
-        if args.branch:
+        if branches:
+            print(f"📋 Branches: {', '.join(branches)}")
+        elif args.branch:
             print(f"📋 Branch: {args.branch}")
         if repo_path:
             print(f"📁 Repository: {repo_path}")
         print()
         
+        if branches:
+            responses = client.get_commit_counts(repo_path, branches)
+            if args.json_only:
+                print(dumps_json(responses))
+            else:
+                print("\n\n".join(format_output(response, args.verbose) for response in responses))
+            sys.exit(0 if all(response.get("STATUS_CODE") == 200 for response in responses) else 1)
+        
         response = client.get_commit_count(repo_path, args.branch)
         
         # Output results
         if args.json_only:
-            print(json.dumps(response, indent=2))
+            print(dumps_json(response))
         else:
             print(format_output(response, args.verbose))
         
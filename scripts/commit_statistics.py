@@ -16,256 +16,134 @@ Examples:
     python commit_stats_example.py --author "jane.smith" --branch feature-auth --after "2024-06-01"
 """
 import argparse
-import json
+import bisect
 import sys
-from datetime import datetime, timedelta
-from os import environ
-from pathlib import Path
-from typing import Optional
+from functools import lru_cache, partial
+from typing import List, NamedTuple, Optional
 
-import requests
-from requests import RequestException
+# Filters shown in the CLI banner and in the summary, as (field, label) pairs
+_FILTER_FIELDS = (("branch", "Branch"), ("author", "Author"), ("after", "After"), ("before", "Before"))
+_SUMMARY_FILTER_FIELDS = (("author", "👤 Author"), ("after", "📅 After"), ("before", "📅 Before"))
 
 
-class GitStatsClient:
-    """Client for interacting with the GitStats API."""
-    
-    def __init__(self, api_url: str = "http://127.0.0.1:8000"):
-        self.api_url = api_url.rstrip('/')
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "User-Agent": "GitStats-Client/1.0"
-        })
-    
-    def set_repo_path(self, repo_path: str) -> dict:
-        """Set the repository path in the API."""
-        try:
-            response = self.session.post(
-                f"{self.api_url}/set_repo",
-                params={"repo": repo_path},
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RequestException(f"Failed to set repository path: {e}")
-    
-    def get_commit_statistics(
-        self, 
-        repo_path: Optional[str] = None,
-        branch: Optional[str] = None,
-        author: Optional[str] = None,
-        after: Optional[str] = None,
-        before: Optional[str] = None
-    ) -> dict:
-        """Get commit statistics from the API."""
-        try:
-            # Set repo path if provided
-            if repo_path:
-                self.set_repo_path(repo_path)
-            
-            # Build query parameters
-            params = {}
-            if branch:
-                params["branch"] = branch
-            if author:
-                params["author"] = author
-            if after:
-                params["after"] = after
-            if before:
-                params["before"] = before
-            
-            response = self.session.get(
-                f"{self.api_url}/commit_statistics",
-                params=params,
-                timeout=60  # Longer timeout for potentially large operations
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RequestException(f"Failed to get commit statistics: {e}")
-    
-    def get_branches(self, repo_path: Optional[str] = None) -> dict:
-        """Get available branches to help with validation."""
-        try:
-            if repo_path:
-                self.set_repo_path(repo_path)
-            
-            response = self.session.get(f"{self.api_url}/branches", timeout=30)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RequestException(f"Failed to get branches: {e}")
-
-
-def validate_repo_path(repo_path: str) -> Path:
-    """Validate that the repository path exists and is a directory."""
-    path = Path(repo_path).expanduser().resolve()
-    if not path.exists():
-        raise ValueError(f"Repository path does not exist: {path}")
-    if not path.is_dir():
-        raise ValueError(f"Repository path is not a directory: {path}")
-    if not (path / ".git").exists():
-        raise ValueError(f"Not a git repository (no .git directory found): {path}")
-    return path
+class StatsPayload(NamedTuple):
+    """The parts of a /commit_statistics response that the formatters show."""
+    
+    repo: str = "unknown"
+    branch: str = "unknown"
+    files: int = 0
+    insertions: int = 0
+    deletions: int = 0
+    author: Optional[str] = None
+    after: Optional[str] = None
+    before: Optional[str] = None
+    
+    @classmethod
+    def from_data(cls, data: dict) -> "StatsPayload":
+        """Unpack the DATA of a successful response once, so the formatters can use plain attributes."""
+        stats = data.get("commit_statistics", {})
+        return cls(
+            repo=data.get("repo", "unknown"),
+            branch=data.get("branch", "unknown"),
+            files=stats.get("files", 0),
+            insertions=stats.get("insertions", 0),
+            deletions=stats.get("deletions", 0),
+            author=stats.get("author"),
+            after=stats.get("after"),
+            before=stats.get("before")
+        )
 
 
-def validate_date_format(date_string: str) -> str:
-    """Validate and suggest corrections for date formats."""
-    if not date_string:
-        return date_string
-    
-    # Common date formats to try
-    formats = [
-        "%Y-%m-%d",      # 2024-01-01
-        "%m/%d/%Y",      # 01/01/2024
-        "%d/%m/%Y",      # 01/01/2024
-        "%Y-%m-%d %H:%M:%S",  # 2024-01-01 10:30:00
-    ]
-    
-    # Try to parse as standard date
-    for fmt in formats:
-        try:
-            datetime.strptime(date_string, fmt)
-            return date_string  # Valid format
-        except ValueError:
-            continue
-    
-    # Check for relative dates (git understands these)
-    relative_patterns = [
-        "today", "yesterday", "last week", "last month", "last year",
-        "1 week ago", "2 weeks ago", "1 month ago", "3 months ago", "1 year ago"
-    ]
-    
-    if any(pattern in date_string.lower() for pattern in relative_patterns):
-        return date_string  # Likely valid relative date
-    
-    # If we get here, suggest common formats
-    print(f"⚠️  Warning: Date format '{date_string}' may not be recognized.")
-    print("   Suggested formats:")
-    print("   - YYYY-MM-DD (e.g., 2024-01-01)")
-    print("   - Relative dates (e.g., '1 week ago', 'yesterday', 'last month')")
-    print()
-    
-    return date_string
+# Fixed parts of the commit statistics summary
+_SUMMARY_HEADER = "📊 Commit Statistics Summary\n" + "=" * 60 + "\n📁 Repository: {repo}\n🌿 Branch: {branch}"
+_SUMMARY_STATISTICS = """
+📈 Statistics:
+   📄 Files changed: {files:,}
+   ➕ Lines added: {insertions:,}
+   ➖ Lines removed: {deletions:,}
+   📊 Net change: {net_lines:+,} lines"""
+_SUMMARY_AVERAGES = """
+🔢 Averages per file:
+   ➕ Avg additions: {avg_insertions:.1f} lines
+   ➖ Avg deletions: {avg_deletions:.1f} lines"""
+# Activity level by total lines changed: the label at index i covers totals below _ACTIVITY_THRESHOLDS[i]
+_ACTIVITY_THRESHOLDS = (1, 100, 1000, 10000)
+_ACTIVITY_LABELS = (
+    "💤 Activity level: No changes found",
+    "🟢 Activity level: Low (< 100 lines changed)",
+    "🟡 Activity level: Medium (< 1,000 lines changed)",
+    "🟠 Activity level: High (< 10,000 lines changed)",
+    "🔴 Activity level: Very High (10,000+ lines changed)",
+)
 
 
-def format_statistics_summary(data: dict) -> str:
+def format_statistics_summary(payload: StatsPayload) -> str:
     """Format commit statistics as a comprehensive summary."""
-    stats = data.get("commit_statistics", {})
-    files = stats.get("files", 0)
-    insertions = stats.get("insertions", 0)
-    deletions = stats.get("deletions", 0)
-    net_lines = insertions - deletions
+    files, insertions, deletions = payload.files, payload.insertions, payload.deletions
     
-    # Basic info
-    repo = data.get("repo", "unknown")
-    branch = data.get("branch", "unknown")
-    author = stats.get("author")
-    after = stats.get("after")
-    before = stats.get("before")
-    
-    output = []
-    output.append("📊 Commit Statistics Summary")
-    output.append("=" * 60)
-    
-    # Repository info
-    output.append(f"📁 Repository: {repo}")
-    output.append(f"🌿 Branch: {branch}")
+    output = [_SUMMARY_HEADER.format(repo=payload.repo, branch=payload.branch)]
     
     # Filters applied
-    filters = []
-    if author:
-        filters.append(f"👤 Author: {author}")
-    if after:
-        filters.append(f"📅 After: {after}")
-    if before:
-        filters.append(f"📅 Before: {before}")
+    filters = [f"   {label}: {getattr(payload, field)}" for field, label in _SUMMARY_FILTER_FIELDS if getattr(payload, field)]
     
     if filters:
-        output.append("")
-        output.append("🔍 Filters Applied:")
-        for filter_info in filters:
-            output.append(f"   {filter_info}")
+        output.append("\n🔍 Filters Applied:")
+        output.extend(filters)
     
     # Main statistics
-    output.append("")
-    output.append("📈 Statistics:")
-    output.append(f"   📄 Files changed: {files:,}")
-    output.append(f"   ➕ Lines added: {insertions:,}")
-    output.append(f"   ➖ Lines removed: {deletions:,}")
-    output.append(f"   📊 Net change: {net_lines:+,} lines")
+    output.append(_SUMMARY_STATISTICS.format(files=files, insertions=insertions, deletions=deletions, net_lines=insertions - deletions))
     
     # Additional insights
     if files > 0:
-        avg_insertions = insertions / files
-        avg_deletions = deletions / files
-        output.append("")
-        output.append("🔢 Averages per file:")
-        output.append(f"   ➕ Avg additions: {avg_insertions:.1f} lines")
-        output.append(f"   ➖ Avg deletions: {avg_deletions:.1f} lines")
+        output.append(_SUMMARY_AVERAGES.format(avg_insertions=insertions / files, avg_deletions=deletions / files))
     
     # Activity level indicator
-    output.append("")
-    if insertions + deletions == 0:
-        output.append("💤 Activity level: No changes found")
-    elif insertions + deletions < 100:
-        output.append("🟢 Activity level: Low (< 100 lines changed)")
-    elif insertions + deletions < 1000:
-        output.append("🟡 Activity level: Medium (< 1,000 lines changed)")
-    elif insertions + deletions < 10000:
-        output.append("🟠 Activity level: High (< 10,000 lines changed)")
-    else:
-        output.append("🔴 Activity level: Very High (10,000+ lines changed)")
+    total = insertions + deletions
+    output.append("\n" + _ACTIVITY_LABELS[bisect.bisect_right(_ACTIVITY_THRESHOLDS, total)])
     
     return "\n".join(output)
 
 
-def format_statistics_compact(data: dict) -> str:
+def format_statistics_compact(payload: StatsPayload) -> str:
     """Format commit statistics in a compact one-line format."""
-    stats = data.get("commit_statistics", {})
-    files = stats.get("files", 0)
-    insertions = stats.get("insertions", 0)
-    deletions = stats.get("deletions", 0)
-    
-    branch = data.get("branch", "unknown")
-    author = stats.get("author", "all authors")
-    
-    return f"📊 {branch} | 👤 {author} | 📄 {files} files | ➕{insertions:,} ➖{deletions:,} lines"
+    author = payload.author or "all authors"
+    return f"📊 {payload.branch} | 👤 {author} | 📄 {payload.files} files | ➕{payload.insertions:,} ➖{payload.deletions:,} lines"
 
 
 def format_output(response: dict, format_type: str = "summary", verbose: bool = False) -> str:
     """Format the API response for display."""
+    from client import dumps_json
+    
     output = []
     
     if response.get("STATUS_CODE") == 200:
-        data = response.get("DATA", {})
+        payload = StatsPayload.from_data(response.get("DATA", {}))
         
         if format_type == "compact":
-            output.append(format_statistics_compact(data))
+            output.append(format_statistics_compact(payload))
         else:  # summary
-            output.append(format_statistics_summary(data))
+            output.append(format_statistics_summary(payload))
         
         if verbose:
             output.append("\n" + "=" * 60)
             output.append("📋 Full API Response:")
-            output.append(json.dumps(response, indent=2))
+            output.append(dumps_json(response))
     else:
         # Error response
         output.append("❌ Error Response")
         output.append("=" * 50)
         detail = response.get("detail", response)
         if isinstance(detail, dict):
-            output.append(json.dumps(detail, indent=2))
+            output.append(dumps_json(detail))
         else:
             output.append(str(detail))
     
     return "\n".join(output)
 
 
-def parse_arguments() -> argparse.Namespace:
-    """Parse command line arguments."""
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser; it is built once and reused by every parse_arguments call."""
     parser = argparse.ArgumentParser(
         description="Get commit statistics from GitStats API",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -354,19 +232,52 @@ Date Examples:
         help="Show only files/insertions/deletions numbers (for scripting)"
     )
     
-    return parser.parse_args()
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the local cache of statistics responses"
+    )
+    
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore any cached statistics response and replace it with a fresh one. Responses are cached when --branch is given "
+        "and the dates are absolute (e.g. 2024-01-01) or left out"
+    )
+    
+    return parser
+
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments, from sys.argv unless argv is given."""
+    return _build_parser().parse_args(argv)
 
 
 def main():
     """Main function."""
+    # argparse handles --help and usage errors by exiting, so parse before importing the client,
+    # which pulls in requests
+    args = parse_arguments()
+    
+    from requests import RequestException
+    
+    from client import (
+        DEFAULT_REPO_PATH,
+        dumps_json,
+        fetch_while_validating_branch,
+        get_client,
+        is_absolute_date,
+        is_local_api,
+        validate_date_format,
+        validate_repo_path,
+    )
+    
     try:
-        args = parse_arguments()
-        
         # Determine repository path
-        repo_path = args.repo or f"{environ.get('HOME', '.')}/repos/gitstats"
+        repo_path = args.repo or DEFAULT_REPO_PATH
         
-        # Validate repository path if provided
-        if repo_path:
+        # Validate repository path if provided; a remote API's paths don't exist here, so leave those to the server
+        if repo_path and is_local_api(args.api_url):
             try:
                 validated_path = validate_repo_path(repo_path)
                 repo_path = str(validated_path)
@@ -381,60 +292,47 @@ def main():
             args.before = validate_date_format(args.before)
         
         # Create client
-        client = GitStatsClient(args.api_url)
+        client = get_client(args.api_url)
+        
+        # A relative date like "1 week ago" means something different on every run, and without --branch the
+        # server uses whatever branch it was last set to, so only those queries with neither are cached on disk
+        fetch_statistics = partial(
+            client.get_commit_statistics,
+            repo_path=repo_path,
+            branch=args.branch,
+            author=args.author,
+            after=args.after,
+            before=args.before,
+            refresh=args.refresh,
+            disk_cache=not args.no_cache
+            and bool(args.branch)
+            and all(not date or is_absolute_date(date) for date in (args.after, args.before))
+        )
         
         # Validate branch if requested
+        stats_future = None
         if args.validate_branch and args.branch:
-            print(f"🔍 Validating branch '{args.branch}'...")
-            try:
-                branches_response = client.get_branches(repo_path)
-                if branches_response.get("STATUS_CODE") == 200:
-                    available_branches = branches_response.get("DATA", {}).get("branches", [])
-                    if args.branch not in available_branches:
-                        print(f"❌ Branch '{args.branch}' not found.", file=sys.stderr)
-                        print(f"Available branches: {', '.join(available_branches)}", file=sys.stderr)
-                        sys.exit(1)
-                    print(f"✅ Branch '{args.branch}' found.")
-            except RequestException as e:
-                print(f"⚠️  Could not validate branch: {e}", file=sys.stderr)
+            stats_future = fetch_while_validating_branch(client, repo_path, args.branch, fetch_statistics)
         
         # Show what we're analyzing
         print(f"🔍 Fetching commit statistics from {args.api_url}...")
         if repo_path:
             print(f"📁 Repository: {repo_path}")
         
-        filters = []
-        if args.branch:
-            filters.append(f"Branch: {args.branch}")
-        if args.author:
-            filters.append(f"Author: {args.author}")
-        if args.after:
-            filters.append(f"After: {args.after}")
-        if args.before:
-            filters.append(f"Before: {args.before}")
-        
+        filters = " | ".join(f"{label}: {getattr(args, field)}" for field, label in _FILTER_FIELDS if getattr(args, field))
         if filters:
-            print(f"🔍 Filters: {' | '.join(filters)}")
+            print(f"🔍 Filters: {filters}")
         print()
         
         # Get commit statistics
-        response = client.get_commit_statistics(
-            repo_path=repo_path,
-            branch=args.branch,
-            author=args.author,
-            after=args.after,
-            before=args.before
-        )
+        response = stats_future.result() if stats_future else fetch_statistics()
         
         # Output results
         if args.json_only:
-            print(json.dumps(response, indent=2))
+            print(dumps_json(response))
         elif args.quick_stats and response.get("STATUS_CODE") == 200:
-            stats = response.get("DATA", {}).get("commit_statistics", {})
-            files = stats.get("files", 0)
-            insertions = stats.get("insertions", 0)
-            deletions = stats.get("deletions", 0)
-            print(f"{files},{insertions},{deletions}")
+            payload = StatsPayload.from_data(response.get("DATA", {}))
+            print(f"{payload.files},{payload.insertions},{payload.deletions}")
         else:
             print(format_output(response, args.format, args.verbose))
         
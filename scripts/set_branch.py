@@ -17,29 +17,49 @@ Examples:
     python set_branch_example.py --list-branches
 """
 import argparse
-import json
+import copy
+import os
 import sys
-from os import environ
-from pathlib import Path
-from typing import Optional, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Optional, List, Tuple
 
 import requests
 from requests import RequestException
 
+from client import DEFAULT_REPO_PATH, create_session, dumps_json, loads_json, validate_repo_path
+
 
 class GitStatsClient:
     """Client for interacting with the GitStats API."""
     
-    def __init__(self, api_url: str = "http://127.0.0.1:8000"):
+    def __init__(self, api_url: str = "http://127.0.0.1:8000", cache_ttl: float = 5.0):
         self.api_url = api_url.rstrip('/')
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "User-Agent": "GitStats-Client/1.0"
-        })
+        self.session = self.get_session()
+        # Recent GET responses, keyed by endpoint; set_repo_path and set_branch clear them,
+        # since either can change what the reads return
+        self.cache_ttl = cache_ttl
+        self._cache: Dict[str, Tuple[float, dict]] = {}
+    
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        """Create the session used for every request; override to customize headers, pooling or retries."""
+        # Room in the pool for the concurrent status reads
+        return create_session(pool_maxsize=20)
+    
+    def _cached_get(self, endpoint: str) -> dict:
+        """GET endpoint and return its JSON, reusing a copy of a response from the last cache_ttl seconds."""
+        entry = self._cache.get(endpoint)
+        if entry is None or time.monotonic() - entry[0] > self.cache_ttl:
+            response = self.session.get(f"{self.api_url}{endpoint}", timeout=30)
+            response.raise_for_status()
+            entry = self._cache[endpoint] = (time.monotonic(), loads_json(response))
+        return copy.deepcopy(entry[1])
     
     def set_repo_path(self, repo_path: str) -> dict:
         """Set the repository path in the API."""
+        self._cache.clear()
         try:
             response = self.session.post(
                 f"{self.api_url}/set_repo",
@@ -47,65 +67,61 @@ class GitStatsClient:
                 timeout=30
             )
             response.raise_for_status()
-            return response.json()
+            return loads_json(response)
         except requests.RequestException as e:
             raise RequestException(f"Failed to set repository path: {e}")
     
-    def set_branch(self, branch: Optional[str] = None) -> dict:
-        """Set the active branch in the API."""
+    def set_branch(self, branch: Optional[str] = None, validate: bool = False) -> dict:
+        """Set the active branch in the API, optionally having the server reject unknown branches."""
+        self._cache.clear()
         try:
             params = {}
             if branch:
                 params["branch"] = branch
+            if validate:
+                params["validate"] = "true"
             
             response = self.session.post(
                 f"{self.api_url}/set_branch",
                 params=params,
                 timeout=30
             )
+            # An unknown branch under validate is an answer, not a transport failure; its body says why
+            if validate and response.status_code == 404:
+                return loads_json(response)
             response.raise_for_status()
-            return response.json()
+            return loads_json(response)
         except requests.RequestException as e:
             raise RequestException(f"Failed to set branch: {e}")
     
     def get_branches(self) -> dict:
         """Get available branches from the API."""
         try:
-            response = self.session.get(f"{self.api_url}/branches", timeout=30)
-            response.raise_for_status()
-            return response.json()
+            return self._cached_get("/branches")
         except requests.RequestException as e:
             raise RequestException(f"Failed to get branches: {e}")
     
     def get_current_branch(self) -> dict:
         """Get current branch from the API."""
         try:
-            response = self.session.get(f"{self.api_url}/current_branch", timeout=30)
-            response.raise_for_status()
-            return response.json()
+            return self._cached_get("/current_branch")
         except requests.RequestException as e:
             raise RequestException(f"Failed to get current branch: {e}")
     
     def get_current_branch_internal(self) -> dict:
         """Get internally set branch from the API."""
         try:
-            response = self.session.get(f"{self.api_url}/current_branch_internal", timeout=30)
-            response.raise_for_status()
-            return response.json()
+            return self._cached_get("/current_branch_internal")
         except requests.RequestException as e:
             raise RequestException(f"Failed to get internal branch: {e}")
 
 
-def validate_repo_path(repo_path: str) -> Path:
-    """Validate that the repository path exists and is a directory."""
-    path = Path(repo_path).expanduser().resolve()
-    if not path.exists():
-        raise ValueError(f"Repository path does not exist: {path}")
-    if not path.is_dir():
-        raise ValueError(f"Repository path is not a directory: {path}")
-    if not (path / ".git").exists():
-        raise ValueError(f"Not a git repository (no .git directory found): {path}")
-    return path
+def fetch_concurrently(*fetches: Callable[[], dict]) -> List[dict]:
+    """Run independent API reads at the same time and return their responses in order; the first failure is raised."""
+    # The reads only depend on the repository set beforehand, so they can share the session's connection pool
+    with ThreadPoolExecutor(max_workers=len(fetches)) as executor:
+        futures = [executor.submit(fetch) for fetch in fetches]
+    return [future.result() for future in futures]
 
 
 def interactive_branch_selection(branches: List[str], current_branch: str) -> Optional[str]:
@@ -114,21 +130,18 @@ def interactive_branch_selection(branches: List[str], current_branch: str) -> Op
         print("❌ No branches available for selection.")
         return None
     
-    print("\n🌿 Available Branches:")
-    print("=" * 40)
-    
     # Sort branches with current branch first
-    sorted_branches = sorted(branches)
-    if current_branch and current_branch in sorted_branches:
-        sorted_branches.remove(current_branch)
-        sorted_branches.insert(0, current_branch)
+    sorted_branches = sorted(branches, key=lambda branch: (branch != current_branch, branch))
     
-    for i, branch in enumerate(sorted_branches, 1):
-        marker = "📍 (current)" if branch == current_branch else ""
-        print(f"{i:2d}. {branch} {marker}")
-    
-    print(f"\n{len(sorted_branches)+1:2d}. Clear branch setting (use repo default)")
-    print(f"{len(sorted_branches)+2:2d}. Cancel")
+    # Print the whole menu at once rather than a line per branch
+    menu = ["\n🌿 Available Branches:", "=" * 40]
+    menu.extend(
+        f"{i:2d}. {branch} 📍 (current)" if branch == current_branch else f"{i:2d}. {branch}"
+        for i, branch in enumerate(sorted_branches, 1)
+    )
+    menu.append(f"\n{len(sorted_branches)+1:2d}. Clear branch setting (use repo default)")
+    menu.append(f"{len(sorted_branches)+2:2d}. Cancel")
+    print("\n".join(menu))
     
     while True:
         try:
@@ -162,26 +175,24 @@ def interactive_branch_selection(branches: List[str], current_branch: str) -> Op
 def format_branch_status(response: dict) -> str:
     """Format the branch setting response with status information."""
     if response.get("STATUS_CODE") != 200:
-        return "❌ Failed to set branch"
+        reason = response.get("detail") or response.get("error")
+        return f"❌ Failed to set branch: {reason}" if reason else "❌ Failed to set branch"
     
     data = response.get("DATA", {})
     branch = data.get("branch")
     repo = data.get("repo", "unknown")
     
-    output = []
-    output.append("✅ Branch Configuration Updated")
-    output.append("=" * 50)
-    output.append(f"📁 Repository: {repo}")
-    
+    header = f"✅ Branch Configuration Updated\n{'=' * 50}\n📁 Repository: {repo}\n"
     if branch:
-        output.append(f"🌿 Active branch: {branch}")
-        output.append("\n💡 This branch will be used for subsequent API operations")
-        output.append("   (unless overridden by specific endpoint parameters)")
-    else:
-        output.append("🌿 Active branch: (cleared - will use repository default)")
-        output.append("\n💡 API operations will use the repository's current branch")
-    
-    return "\n".join(output)
+        return (
+            f"{header}🌿 Active branch: {branch}\n"
+            "\n💡 This branch will be used for subsequent API operations\n"
+            "   (unless overridden by specific endpoint parameters)"
+        )
+    return (
+        f"{header}🌿 Active branch: (cleared - will use repository default)\n"
+        "\n💡 API operations will use the repository's current branch"
+    )
 
 
 def format_branch_comparison(before_response: dict, after_response: dict) -> str:
@@ -192,27 +203,17 @@ def format_branch_comparison(before_response: dict, after_response: dict) -> str
     before_branch = before_data.get("branch") or "(repository default)"
     after_branch = after_data.get("branch") or "(repository default)"
     
-    output = []
-    output.append("🔄 Branch Setting Change")
-    output.append("=" * 40)
-    output.append(f"Before: {before_branch}")
-    output.append(f"After:  {after_branch}")
-    
-    if before_branch != after_branch:
-        output.append("\n✅ Branch setting successfully updated!")
-    else:
-        output.append("\n💡 Branch setting unchanged")
-    
-    return "\n".join(output)
+    outcome = "✅ Branch setting successfully updated!" if before_branch != after_branch else "💡 Branch setting unchanged"
+    return f"🔄 Branch Setting Change\n{'=' * 40}\nBefore: {before_branch}\nAfter:  {after_branch}\n\n{outcome}"
 
 
 def list_branches_with_status(client: GitStatsClient) -> str:
     """List all branches with current status indicators."""
     try:
         # Get all information
-        branches_response = client.get_branches()
-        current_response = client.get_current_branch()
-        internal_response = client.get_current_branch_internal()
+        branches_response, current_response, internal_response = fetch_concurrently(
+            client.get_branches, client.get_current_branch, client.get_current_branch_internal
+        )
         
         if branches_response.get("STATUS_CODE") != 200:
             return "❌ Failed to get branch information"
@@ -263,8 +264,9 @@ def list_branches_with_status(client: GitStatsClient) -> str:
         return f"❌ Error getting branch information: {e}"
 
 
-def parse_arguments() -> argparse.Namespace:
-    """Parse command line arguments."""
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser; it is built once and reused by every parse_arguments call."""
     parser = argparse.ArgumentParser(
         description="Set active branch for GitStats API operations",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -348,10 +350,15 @@ Notes:
     parser.add_argument(
         "--validate",
         action="store_true",
-        help="Validate that the branch exists before setting it"
+        help="Have the server reject the branch with an error if it does not exist"
     )
     
-    return parser.parse_args()
+    return parser
+
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments, from sys.argv unless argv is given."""
+    return _build_parser().parse_args(argv)
 
 
 def main():
@@ -378,10 +385,14 @@ def main():
             sys.exit(1)
         
         # Determine repository path
-        repo_path = args.repo or f"{environ.get('HOME', '.')}/repos/gitstats"
+        repo_path = args.repo or DEFAULT_REPO_PATH
         
-        # Validate repository path if provided
-        if repo_path:
+        # Validate repository path if provided; --list-branches and --status only read, so the
+        # server's own check on set_repo is enough for them, but a relative or ~ path must still be
+        # made absolute here, or the server would resolve it against its own working directory
+        if repo_path and (args.list_branches or args.status):
+            repo_path = os.path.abspath(os.path.expanduser(repo_path))
+        elif repo_path:
             try:
                 validated_path = validate_repo_path(repo_path)
                 repo_path = str(validated_path)
@@ -408,15 +419,16 @@ def main():
         elif args.status:
             # Show current status
             try:
-                current_response = client.get_current_branch()
-                internal_response = client.get_current_branch_internal()
+                current_response, internal_response = fetch_concurrently(
+                    client.get_current_branch, client.get_current_branch_internal
+                )
                 
                 if args.json_only:
                     status_data = {
                         "current_branch": current_response,
                         "internal_branch": internal_response
                     }
-                    print(json.dumps(status_data, indent=2))
+                    print(dumps_json(status_data))
                 else:
                     current_data = current_response.get("DATA", {}) if current_response.get("STATUS_CODE") == 200 else {}
                     internal_data = internal_response.get("DATA", {}) if internal_response.get("STATUS_CODE") == 200 else {}
@@ -460,30 +472,14 @@ def main():
             elif args.branch:
                 target_branch = args.branch
                 
-                # Validate branch if requested
-                if args.validate:
-                    print(f"🔍 Validating branch '{target_branch}'...")
-                    try:
-                        branches_response = client.get_branches()
-                        if branches_response.get("STATUS_CODE") == 200:
-                            available_branches = branches_response.get("DATA", {}).get("branches", [])
-                            if target_branch not in available_branches:
-                                print(f"❌ Branch '{target_branch}' not found.", file=sys.stderr)
-                                print(f"Available branches: {', '.join(available_branches)}", file=sys.stderr)
-                                sys.exit(1)
-                            print(f"✅ Branch '{target_branch}' found.")
-                        else:
-                            print("⚠️  Could not validate branch (continuing anyway)")
-                    except RequestException as e:
-                        print(f"⚠️  Could not validate branch: {e}")
-                
                 print(f"🌿 Setting active branch to '{target_branch}'...")
                 
             elif args.interactive:
                 # Interactive selection
                 try:
-                    branches_response = client.get_branches()
-                    current_response = client.get_current_branch_internal()
+                    branches_response, current_response = fetch_concurrently(
+                        client.get_branches, client.get_current_branch_internal
+                    )
                     
                     if branches_response.get("STATUS_CODE") != 200:
                         print("❌ Failed to get available branches for selection", file=sys.stderr)
@@ -508,23 +504,24 @@ def main():
                 if target_branch == "":
                     response = client.set_branch(None)  # Clear setting
                 else:
-                    response = client.set_branch(target_branch)
+                    # --validate is checked by the server in the same request
+                    response = client.set_branch(target_branch, validate=args.validate)
                 
                 # Output results
                 if args.json_only:
-                    print(json.dumps(response, indent=2))
+                    print(dumps_json(response))
                 elif args.compare and before_response:
                     print(format_branch_comparison(before_response, response))
                     if args.verbose:
                         print("\n" + "=" * 50)
                         print("📋 Full API Response:")
-                        print(json.dumps(response, indent=2))
+                        print(dumps_json(response))
                 else:
                     print(format_branch_status(response))
                     if args.verbose:
                         print("\n" + "=" * 50)
                         print("📋 Full API Response:")
-                        print(json.dumps(response, indent=2))
+                        print(dumps_json(response))
                 
                 # Exit with appropriate code
                 sys.exit(0 if response.get("STATUS_CODE") == 200 else 1)
@@ -16,137 +16,13 @@ Examples:
     python top_authors_example.py --limit 3 --format leaderboard
 """
 import argparse
-import json
 import sys
-from datetime import datetime
-from os import environ
-from pathlib import Path
-from typing import Optional, List, Dict
+from functools import partial
+from typing import List, Dict
 
-import requests
-from requests import RequestException
-
-
-class GitStatsClient:
-    """Client for interacting with the GitStats API."""
-    
-    def __init__(self, api_url: str = "http://127.0.0.1:8000"):
-        self.api_url = api_url.rstrip('/')
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "User-Agent": "GitStats-Client/1.0"
-        })
-    
-    def set_repo_path(self, repo_path: str) -> dict:
-        """Set the repository path in the API."""
-        try:
-            response = self.session.post(
-                f"{self.api_url}/set_repo",
-                params={"repo": repo_path},
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RequestException(f"Failed to set repository path: {e}")
-    
-    def get_top_authors(
-        self, 
-        repo_path: Optional[str] = None,
-        branch: Optional[str] = None,
-        after: Optional[str] = None,
-        before: Optional[str] = None,
-        limit: int = 10
-    ) -> dict:
-        """Get top authors from the API."""
-        try:
-            # Set repo path if provided
-            if repo_path:
-                self.set_repo_path(repo_path)
-            
-            # Build query parameters
-            params = {"limit": limit}
-            if branch:
-                params["branch"] = branch
-            if after:
-                params["after"] = after
-            if before:
-                params["before"] = before
-            
-            response = self.session.get(
-                f"{self.api_url}/top_authors",
-                params=params,
-                timeout=60  # Longer timeout for potentially large operations
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RequestException(f"Failed to get top authors: {e}")
-    
-    def get_branches(self, repo_path: Optional[str] = None) -> dict:
-        """Get available branches to help with validation."""
-        try:
-            if repo_path:
-                self.set_repo_path(repo_path)
-            
-            response = self.session.get(f"{self.api_url}/branches", timeout=30)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RequestException(f"Failed to get branches: {e}")
-
-
-def validate_repo_path(repo_path: str) -> Path:
-    """Validate that the repository path exists and is a directory."""
-    path = Path(repo_path).expanduser().resolve()
-    if not path.exists():
-        raise ValueError(f"Repository path does not exist: {path}")
-    if not path.is_dir():
-        raise ValueError(f"Repository path is not a directory: {path}")
-    if not (path / ".git").exists():
-        raise ValueError(f"Not a git repository (no .git directory found): {path}")
-    return path
-
-
-def validate_date_format(date_string: str) -> str:
-    """Validate and suggest corrections for date formats."""
-    if not date_string:
-        return date_string
-    
-    # Common date formats to try
-    formats = [
-        "%Y-%m-%d",      # 2024-01-01
-        "%m/%d/%Y",      # 01/01/2024
-        "%d/%m/%Y",      # 01/01/2024
-        "%Y-%m-%d %H:%M:%S",  # 2024-01-01 10:30:00
-    ]
-    
-    # Try to parse as standard date
-    for fmt in formats:
-        try:
-            datetime.strptime(date_string, fmt)
-            return date_string  # Valid format
-        except ValueError:
-            continue
-    
-    # Check for relative dates (git understands these)
-    relative_patterns = [
-        "today", "yesterday", "last week", "last month", "last year",
-        "1 week ago", "2 weeks ago", "1 month ago", "3 months ago", "1 year ago"
-    ]
-    
-    if any(pattern in date_string.lower() for pattern in relative_patterns):
-        return date_string  # Likely valid relative date
-    
-    # If we get here, suggest common formats
-    print(f"⚠️  Warning: Date format '{date_string}' may not be recognized.")
-    print("   Suggested formats:")
-    print("   - YYYY-MM-DD (e.g., 2024-01-01)")
-    print("   - Relative dates (e.g., '1 week ago', 'yesterday', 'last month')")
-    print()
-    
-    return date_string
+# Leaderboard activity bars, indexed by filled length
+_BAR_LENGTH = 20
+_BARS = tuple("█" * filled + "░" * (_BAR_LENGTH - filled) for filled in range(_BAR_LENGTH + 1))
 
 
 def get_medal_emoji(rank: int) -> str:
@@ -166,9 +42,7 @@ def format_leaderboard(authors: List[Dict], total_authors: int, filters: Dict) -
     if not authors:
         return "No authors found matching the criteria."
     
-    output = []
-    output.append("🏆 Developer Leaderboard")
-    output.append("=" * 70)
+    output = ["🏆 Developer Leaderboard", "=" * 70]
     
     # Show filters if any
     filter_info = []
@@ -180,51 +54,55 @@ def format_leaderboard(authors: List[Dict], total_authors: int, filters: Dict) -
         filter_info.append(f"📅 Before: {filters['before']}")
     
     if filter_info:
-        output.append(" | ".join(filter_info))
-        output.append("-" * 70)
-    
-    # Calculate max name width for alignment
-    max_name_width = max(len(author["name"]) for author in authors) if authors else 10
-    max_name_width = max(max_name_width, 15)  # Minimum width
-    
-    # Header
-    output.append(f"{'Rank':<6} {'Developer':<{max_name_width}} {'Commits':<10} {'Activity'}")
-    output.append("-" * (6 + max_name_width + 20))
-    
-    # Find max commits for progress bar scaling
-    max_commits = max(author["commit_count"] for author in authors) if authors else 1
-    
-    # Author rankings
-    for i, author in enumerate(authors, 1):
-        name = author["name"]
+        output.extend((" | ".join(filter_info), "-" * 70))
+    
+    # Name width for alignment, max commits for progress bar scaling and the total for the statistics, in one pass
+    max_name_width = 15  # Minimum width
+    max_commits = 0
+    total_commits = 0
+    for author in authors:
+        name_width = len(author["name"])
         commits = author["commit_count"]
-        medal = get_medal_emoji(i)
-        
-        # Create a visual progress bar
-        bar_length = 20
-        filled_length = int((commits / max_commits) * bar_length) if max_commits > 0 else 0
-        bar = "█" * filled_length + "░" * (bar_length - filled_length)
-        
-        output.append(f"{medal:<6} {name:<{max_name_width}} {commits:<10,} {bar}")
+        if name_width > max_name_width:
+            max_name_width = name_width
+        if commits > max_commits:
+            max_commits = commits
+        total_commits += commits
     
-    output.append("")
-    output.append(f"📊 Showing top {len(authors)} of {total_authors} total contributors")
+    # Header
+    output.extend((
+        f"{'Rank':<6} {'Developer':<{max_name_width}} {'Commits':<10} {'Activity'}",
+        "-" * (6 + max_name_width + 20),
+    ))
+    
+    # Author rankings with a visual progress bar, with the name width resolved into the row format once
+    row_format = f"{{:<6}} {{:<{max_name_width}}} {{:<10,}} {{}}"
+    output.extend(
+        row_format.format(
+            get_medal_emoji(i),
+            author["name"],
+            author["commit_count"],
+            _BARS[int((author["commit_count"] / max_commits) * _BAR_LENGTH) if max_commits > 0 else 0],
+        )
+        for i, author in enumerate(authors, 1)
+    )
     
     # Calculate some basic stats
-    if authors:
-        total_commits = sum(author["commit_count"] for author in authors)
-        avg_commits = total_commits / len(authors)
-        top_author = authors[0]
-        
-        output.append("")
-        output.append("📈 Statistics:")
-        output.append(f"   🎯 Top contributor: {top_author['name']} ({top_author['commit_count']:,} commits)")
-        output.append(f"   📊 Total commits (top {len(authors)}): {total_commits:,}")
-        output.append(f"   📊 Average commits: {avg_commits:.1f}")
-        
-        if len(authors) > 1:
-            commit_range = authors[0]["commit_count"] - authors[-1]["commit_count"]
-            output.append(f"   📏 Commit range: {commit_range:,} commits")
+    avg_commits = total_commits / len(authors)
+    top_author = authors[0]
+    output.extend((
+        "",
+        f"📊 Showing top {len(authors)} of {total_authors} total contributors",
+        "",
+        "📈 Statistics:",
+        f"   🎯 Top contributor: {top_author['name']} ({top_author['commit_count']:,} commits)",
+        f"   📊 Total commits (top {len(authors)}): {total_commits:,}",
+        f"   📊 Average commits: {avg_commits:.1f}",
+    ))
+    
+    if len(authors) > 1:
+        commit_range = authors[0]["commit_count"] - authors[-1]["commit_count"]
+        output.append(f"   📏 Commit range: {commit_range:,} commits")
     
     return "\n".join(output)
 
@@ -234,31 +112,35 @@ def format_table(authors: List[Dict], total_authors: int, filters: Dict) -> str:
     if not authors:
         return "No authors found matching the criteria."
     
-    output = []
-    output.append("👥 Top Contributors")
-    output.append("=" * 50)
+    output = ["👥 Top Contributors", "=" * 50]
     
-    # Calculate max name width for alignment
-    max_name_width = max(len(author["name"]) for author in authors) if authors else 10
-    max_name_width = max(max_name_width, 15)
+    # Name width for alignment and total commits for percentages, in one pass
+    max_name_width = 15
+    total_commits = 0
+    for author in authors:
+        if len(author["name"]) > max_name_width:
+            max_name_width = len(author["name"])
+        total_commits += author["commit_count"]
     
     # Header
-    output.append(f"{'#':<4} {'Author':<{max_name_width}} {'Commits':<10} {'%'}")
-    output.append("-" * (4 + max_name_width + 20))
-    
-    # Calculate total commits for percentage
-    total_commits = sum(author["commit_count"] for author in authors) if authors else 1
-    
-    # Author list
-    for i, author in enumerate(authors, 1):
-        name = author["name"]
-        commits = author["commit_count"]
-        percentage = (commits / total_commits * 100) if total_commits > 0 else 0
-        
-        output.append(f"{i:<4} {name:<{max_name_width}} {commits:<10,} {percentage:5.1f}%")
+    output.extend((
+        f"{'#':<4} {'Author':<{max_name_width}} {'Commits':<10} {'%'}",
+        "-" * (4 + max_name_width + 20),
+    ))
+    
+    # Author list, with the name width resolved into the row format once
+    row_format = f"{{:<4}} {{:<{max_name_width}}} {{:<10,}} {{:5.1f}}%"
+    output.extend(
+        row_format.format(
+            i,
+            author["name"],
+            author["commit_count"],
+            (author["commit_count"] / total_commits * 100) if total_commits > 0 else 0,
+        )
+        for i, author in enumerate(authors, 1)
+    )
     
-    output.append("")
-    output.append(f"Total: {len(authors)} of {total_authors} contributors shown")
+    output.extend(("", f"Total: {len(authors)} of {total_authors} contributors shown"))
     
     return "\n".join(output)
 
@@ -279,6 +161,28 @@ def format_compact(authors: List[Dict], total_authors: int, filters: Dict) -> st
     return f"👥 Top Authors: {result}"
 
 
+def format_top_only(authors: List[Dict]) -> str:
+    """Format the detailed view of the top authors shown with --top-only."""
+    if not authors:
+        return "No authors found matching the criteria."
+    
+    output = [f"🏆 Top {len(authors)} Contributor{'s' if len(authors) != 1 else ''}:", "=" * 50]
+    output.extend(
+        f"{get_medal_emoji(i)} {author['name']}: {author['commit_count']:,} commits"
+        for i, author in enumerate(authors, 1)
+    )
+    return "\n".join(output)
+
+
+def format_batch_output(response: dict, format_type: str = "leaderboard") -> str:
+    """Format a /top_authors_batch response, one section per query."""
+    if response.get("STATUS_CODE") != 200:
+        return format_output(response, format_type)
+    return "\n\n".join(
+        format_output({"STATUS_CODE": 200, "DATA": data}, format_type) for data in response.get("DATA", [])
+    )
+
+
 def format_names_only(authors: List[Dict]) -> str:
     """Format just the author names for scripting."""
     return "\n".join(author["name"] for author in authors)
@@ -286,6 +190,8 @@ def format_names_only(authors: List[Dict]) -> str:
 
 def format_output(response: dict, format_type: str = "leaderboard", verbose: bool = False) -> str:
     """Format the API response for display."""
+    from client import dumps_json
+    
     output = []
     
     if response.get("STATUS_CODE") == 200:
@@ -317,14 +223,14 @@ def format_output(response: dict, format_type: str = "leaderboard", verbose: boo
         if verbose and format_type != "names":
             output.append("\n" + "=" * 60)
             output.append("📋 Full API Response:")
-            output.append(json.dumps(response, indent=2))
+            output.append(dumps_json(response))
     else:
         # Error response
         output.append("❌ Error Response")
         output.append("=" * 50)
         detail = response.get("detail", response)
         if isinstance(detail, dict):
-            output.append(json.dumps(detail, indent=2))
+            output.append(dumps_json(detail))
         else:
             output.append(str(detail))
     
@@ -344,6 +250,10 @@ Examples:
   %(prog)s --limit 3 --format leaderboard                  # Top 3 with visual leaderboard
   %(prog)s --before "2024-06-30" --format table            # Contributors before June 30th
   %(prog)s --format names --limit 10                       # Just names for scripting
+  %(prog)s --batch-file queries.jsonl                      # Several queries in one request
+
+Batch files hold one JSON object of /top_authors parameters per line, e.g.
+  {"branch": "main", "after": "2024-01-01", "limit": 5}
 
 Date Examples:
   --after "2024-01-01"        # Specific date
@@ -430,24 +340,39 @@ Date Examples:
         help="Only show authors with at least N commits (default: 1)"
     )
     
+    parser.add_argument(
+        "--batch-file",
+        metavar="FILE",
+        help="Run the queries in FILE ('-' for stdin), one JSON object per line, in a single request"
+    )
+    
     return parser.parse_args()
 
 
 def main():
     """Main function."""
+    # argparse handles --help and usage errors by exiting, so parse before importing the client,
+    # which pulls in requests
+    args = parse_arguments()
+    
+    from requests import RequestException
+    
+    from client import DEFAULT_REPO_PATH, dumps_json, fetch_while_validating_branch, get_client, is_local_api, validate_date_format, validate_repo_path
+    
     try:
-        args = parse_arguments()
-        
         # Validate limit
         if args.limit < 1 or args.limit > 100:
             print("❌ Error: Limit must be between 1 and 100", file=sys.stderr)
             sys.exit(1)
+        if args.top_only is not None and args.top_only < 1:
+            print("❌ Error: --top-only must be at least 1", file=sys.stderr)
+            sys.exit(1)
         
         # Determine repository path
-        repo_path = args.repo or f"{environ.get('HOME', '.')}/repos/gitstats"
+        repo_path = args.repo or DEFAULT_REPO_PATH
         
-        # Validate repository path if provided
-        if repo_path:
+        # Validate repository path if provided; a remote API's paths don't exist here, so leave those to the server
+        if repo_path and is_local_api(args.api_url):
             try:
                 validated_path = validate_repo_path(repo_path)
                 repo_path = str(validated_path)
@@ -462,22 +387,42 @@ def main():
             args.before = validate_date_format(args.before)
         
         # Create client
-        client = GitStatsClient(args.api_url)
+        client = get_client(args.api_url)
+        
+        if args.batch_file:
+            import json
+            from contextlib import nullcontext
+            
+            try:
+                with nullcontext(sys.stdin) if args.batch_file == "-" else open(args.batch_file, encoding="utf-8") as batch_file:
+                    queries = [json.loads(line) for line in batch_file if line.strip()]
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"❌ Invalid batch file: {e}", file=sys.stderr)
+                sys.exit(1)
+            print(f"🔍 Fetching top authors for {len(queries)} queries from {args.api_url}...")
+            if repo_path:
+                print(f"📁 Repository: {repo_path}")
+            print()
+            
+            response = client.get_top_authors_batch(queries, repo_path)
+            print(dumps_json(response) if args.json_only else format_batch_output(response, args.format))
+            sys.exit(0 if response.get("STATUS_CODE") == 200 else 1)
+        
+        fetch_top_authors = partial(
+            client.get_top_authors,
+            repo_path=repo_path,
+            branch=args.branch,
+            after=args.after,
+            before=args.before,
+            # The server drops the authors --top-only and --min-commits would discard
+            limit=min(args.limit, args.top_only) if args.top_only else args.limit,
+            min_commits=args.min_commits
+        )
         
         # Validate branch if requested
+        authors_future = None
         if args.validate_branch and args.branch:
-            print(f"🔍 Validating branch '{args.branch}'...")
-            try:
-                branches_response = client.get_branches(repo_path)
-                if branches_response.get("STATUS_CODE") == 200:
-                    available_branches = branches_response.get("DATA", {}).get("branches", [])
-                    if args.branch not in available_branches:
-                        print(f"❌ Branch '{args.branch}' not found.", file=sys.stderr)
-                        print(f"Available branches: {', '.join(available_branches)}", file=sys.stderr)
-                        sys.exit(1)
-                    print(f"✅ Branch '{args.branch}' found.")
-            except RequestException as e:
-                print(f"⚠️  Could not validate branch: {e}", file=sys.stderr)
+            authors_future = fetch_while_validating_branch(client, repo_path, args.branch, fetch_top_authors)
         
         # Show what we're analyzing
         print(f"🔍 Fetching top authors from {args.api_url}...")
@@ -498,45 +443,14 @@ def main():
         print()
         
         # Get top authors
-        response = client.get_top_authors(
-            repo_path=repo_path,
-            branch=args.branch,
-            after=args.after,
-            before=args.before,
-            limit=args.limit
-        )
-        
-        # Apply additional filtering if requested
-        if response.get("STATUS_CODE") == 200 and (args.min_commits > 1 or args.top_only):
-            data = response.get("DATA", {})
-            authors = data.get("top_authors", [])
-            
-            # Filter by minimum commits
-            if args.min_commits > 1:
-                authors = [a for a in authors if a["commit_count"] >= args.min_commits]
-            
-            # Limit to top N with detailed info
-            if args.top_only:
-                authors = authors[:args.top_only]
-            
-            # Update the response
-            response["DATA"]["top_authors"] = authors
+        response = authors_future.result() if authors_future else fetch_top_authors()
         
         # Output results
         if args.json_only:
-            print(json.dumps(response, indent=2))
+            print(dumps_json(response))
         elif args.top_only and response.get("STATUS_CODE") == 200:
             # Special detailed view for top-only mode
-            data = response.get("DATA", {})
-            authors = data.get("top_authors", [])
-            if authors:
-                print(f"🏆 Top {len(authors)} Contributor{'s' if len(authors) != 1 else ''}:")
-                print("=" * 50)
-                for i, author in enumerate(authors, 1):
-                    medal = get_medal_emoji(i)
-                    print(f"{medal} {author['name']}: {author['commit_count']:,} commits")
-            else:
-                print("No authors found matching the criteria.")
+            print(format_top_only(response.get("DATA", {}).get("top_authors", [])))
         else:
             print(format_output(response, args.format, args.verbose))
         
@@ -4,6 +4,28 @@
 Utility functions for interacting with FastAPI application gitstats repository.
 """
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared by all helpers so consecutive calls (e.g. set_repo_path then get_branches) reuse one connection.
+# Requests that fail because the server is (re)starting are retried; every endpoint is safe to repeat
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "GitStats-Client/1.0"})
+SESSION.mount(
+    "http://",
+    HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=10,
+        max_retries=Retry(
+            total=3,
+            connect=2,
+            read=1,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET", "POST"]),
+        ),
+    ),
+)
 
 
 def error_message(error) -> str:
@@ -25,15 +47,14 @@ def get_branches(repo=None) -> dict:
     """
     Fetch a list of local branches from a Git repository.
 
+    :param repo: The absolute path to the repository.
     :return: JSON response with a list of local branches.
     """
-    if repo:
-        set_repo_path(repo)
-
     msg = f"get_branches: using repo {repo}"
     print(msg)
     url = "http://localhost:8000/branches"
-    response = requests.get(url, timeout=10)
+    # Passing the repo here saves a separate /set_repo request
+    response = SESSION.get(url, params={"repo": repo} if repo else {}, timeout=10)
     response.raise_for_status()
     return response.json()
 
@@ -51,7 +72,7 @@ def get_commit_statistics(author=None, branch=None, after=None, before=None, rep
     url = "http://localhost:8000/commit_statistics"
     params = {"author": author, "branch": branch, "after": after, "before": before, "repo": repo}
 
-    response = requests.get(url, params=params, timeout=10)
+    response = SESSION.get(url, params=params, timeout=10)
     response.raise_for_status()
 
     return response.json()
@@ -71,7 +92,7 @@ def get_top_authors(branch=None, after=None, before=None, limit=10, repo=None) -
     url = "http://localhost:8000/top_authors"
     params = {"branch": branch, "after": after, "before": before, "limit": limit, "repo": repo}
 
-    response = requests.get(url, params=params, timeout=10)
+    response = SESSION.get(url, params=params, timeout=10)
     response.raise_for_status()
 
     return response.json()
@@ -85,8 +106,9 @@ def set_branch(branch=None) -> dict:
     :return: JSON response indicating success or failure.
     :raises requests.RequestException: If the request fails.
     """
-    url = f"http://localhost:8000/set_branch?branch={branch}"
-    response = requests.post(url, timeout=10)
+    url = "http://localhost:8000/set_branch"
+    # Let requests percent-encode the branch; names may contain "/", "#" or spaces
+    response = SESSION.post(url, params={"branch": branch} if branch else {}, timeout=10)
     response.raise_for_status()
     return response.json()
 
@@ -97,7 +119,7 @@ def set_repo_path(repo) -> dict:
 
     :param repo: Absolute path to the Git repository.
     """
-    url = f"http://localhost:8000/set_repo?repo={repo}"
-    response = requests.post(url, timeout=10)
+    url = "http://localhost:8000/set_repo"
+    response = SESSION.post(url, params={"repo": repo}, timeout=10)
     response.raise_for_status()
     return response.json()
@@ -0,0 +1,82 @@
+"""
+Fixtures for the GitStats API tests.
+
+Each test gets a fresh repository under tmp_path and a TestClient whose application is set to it.
+"""
+import subprocess
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app, git_stats_app
+from client import GitStatsClient
+
+
+def run_git(repo: Path, *args: str, author: str = "Alice") -> str:
+    """Run git in repo, committing as author, and return its output."""
+    command = ["git", "-C", str(repo), "-c", f"user.name={author}", "-c", f"user.email={author.lower()}@example.com", *args]
+    return subprocess.run(command, check=True, capture_output=True, text=True).stdout
+
+
+@pytest.fixture
+def git():
+    """The run_git helper, for tests that change the repository."""
+    return run_git
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    """
+    A repository with two branches.
+
+    main holds two commits by Alice and one by Bob; dev adds one more by Alice.
+    """
+    repo_path = tmp_path / "repo"
+    subprocess.run(["git", "init", "--quiet", "--initial-branch=main", str(repo_path)], check=True)
+    for author in ("Alice", "Alice", "Bob"):
+        run_git(repo_path, "commit", "--quiet", "--allow-empty", "-m", f"Commit by {author}", author=author)
+    run_git(repo_path, "checkout", "--quiet", "-b", "dev")
+    run_git(repo_path, "commit", "--quiet", "--allow-empty", "-m", "Commit on dev")
+    run_git(repo_path, "checkout", "--quiet", "main")
+    return repo_path
+
+
+@pytest.fixture
+def client(repo: Path):
+    """A TestClient for the application, with the repository set to repo."""
+    config = git_stats_app.get_config()
+
+    def reset():
+        config.clear_repo_path()
+        config.branch = None
+        git_stats_app.get_repo_service().cache.clear()
+
+    reset()
+    with TestClient(app) as test_client:
+        test_client.post("/set_repo", json={"repo": str(repo)}).raise_for_status()
+        yield test_client
+    reset()
+
+
+@pytest.fixture
+def stats_client(client: TestClient, tmp_path: Path) -> GitStatsClient:
+    """A scripts/client.py GitStatsClient whose requests go through client, with its disk cache under tmp_path."""
+    stats_client = GitStatsClient("http://testserver", stats_cache_dir=tmp_path / "cache")
+    stats_client.session = client
+    return stats_client
+
+
+@pytest.fixture
+def statuses(stats_client: GitStatsClient, monkeypatch) -> list:
+    """The status codes of the GET requests stats_client sends, in order."""
+    recorded = []
+    get = stats_client.session.get
+
+    def recording_get(*args, **kwargs):
+        response = get(*args, **kwargs)
+        recorded.append(response.status_code)
+        return response
+
+    monkeypatch.setattr(stats_client.session, "get", recording_get)
+    return recorded
@@ -0,0 +1,131 @@
+"""
+Tests for the GitStats API client shared by the scripts.
+"""
+import threading
+import time
+
+import pytest
+
+from client import GitStatsClient, fetch_while_validating_branch, is_absolute_date, validate_date_format
+
+
+class TestRevalidation:
+    """The client revalidates /branches and /top_authors responses by their ETags."""
+
+    def test_unchanged_branches_are_not_downloaded_again(self, stats_client, statuses, repo):
+        first = stats_client.get_branches(str(repo))
+        # refresh skips the client's short-lived cache, so the request reaches the API
+        second = stats_client.get_branches(str(repo), refresh=True)
+        assert statuses == [200, 304]
+        assert second == first
+        assert second["DATA"]["branches"] == ["dev", "main"]
+
+    def test_changed_branches_are_downloaded(self, stats_client, statuses, repo, git):
+        stats_client.get_branches(str(repo))
+        git(repo, "branch", "release")
+        branches = stats_client.get_branches(str(repo), refresh=True)["DATA"]["branches"]
+        assert statuses == [200, 200]
+        assert "release" in branches
+
+    def test_unchanged_top_authors_are_not_downloaded_again(self, stats_client, statuses, repo):
+        first = stats_client.get_top_authors(str(repo), limit=5)
+        second = stats_client.get_top_authors(str(repo), limit=5)
+        assert statuses == [200, 304]
+        assert second == first
+
+
+class TestFetchWhileValidatingBranch:
+    """fetch_while_validating_branch overlaps a fetch with the branch check."""
+
+    def test_returns_the_fetch_result(self, stats_client, repo):
+        future = fetch_while_validating_branch(stats_client, str(repo), "dev", lambda: {"fetched": True})
+        assert future.result(timeout=5) == {"fetched": True}
+
+    def test_missing_branch_exits_without_waiting_for_the_fetch(self, stats_client, repo):
+        release = threading.Event()
+
+        def slow_fetch():
+            release.wait(30)
+            return {}
+
+        existing = set(threading.enumerate())
+        started = time.monotonic()
+        with pytest.raises(SystemExit) as exit_info:
+            fetch_while_validating_branch(stats_client, str(repo), "missing", slow_fetch)
+        assert exit_info.value.code == 1
+        assert time.monotonic() - started < 5
+        # The fetch runs in a daemon thread, which the interpreter doesn't join at exit
+        assert all(thread.daemon for thread in set(threading.enumerate()) - existing)
+        release.set()
+
+
+class TestValidateDateFormat:
+    """validate_date_format returns the date unchanged, warning once about dates git may not understand."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        validate_date_format.cache_clear()
+        yield
+        validate_date_format.cache_clear()
+
+    @pytest.mark.parametrize("date", ["2024-01-31", "2024-1-5", "2024-01-31 12:30:00", "01/31/2024", "1 week ago", "Yesterday", "", None])
+    def test_recognized_dates_pass_silently(self, date, capsys):
+        assert validate_date_format(date) == date
+        assert capsys.readouterr().out == ""
+
+    @pytest.mark.parametrize("date", ["2024-13-45", "31/31/2024", "next tuesday-ish"])
+    def test_unrecognized_dates_warn_once(self, date, capsys):
+        assert validate_date_format(date) == date
+        assert "may not be recognized" in capsys.readouterr().out
+        validate_date_format(date)
+        assert capsys.readouterr().out == ""
+
+    @pytest.mark.parametrize("date, absolute", [("2024-01-31", True), ("01/31/2024", True), ("1 week ago", False), ("2024-01-31 or so", False)])
+    def test_is_absolute_date(self, date, absolute):
+        assert is_absolute_date(date) is absolute
+
+
+class TestStatsDiskCache:
+    """Commit statistics cached on disk are keyed by the API, repository and every filter."""
+
+    def test_cached_statistics_are_reused_by_a_new_client(self, stats_client, statuses, repo, tmp_path):
+        first = stats_client.get_commit_statistics(str(repo), branch="main", after="2024-01-01", disk_cache=True)
+        other_client = GitStatsClient("http://testserver", stats_cache_dir=tmp_path / "cache")
+        other_client.session = stats_client.session
+        assert other_client.get_commit_statistics(str(repo), branch="main", after="2024-01-01", disk_cache=True) == first
+        assert statuses == [200]
+
+    @pytest.mark.parametrize(
+        "changed",
+        [{"branch": "dev"}, {"author": "Alice"}, {"after": "2024-01-02"}, {"before": "2099-01-01"}],
+    )
+    def test_any_changed_filter_misses(self, stats_client, statuses, repo, changed):
+        filters = {"branch": "main", "after": "2024-01-01"}
+        stats_client.get_commit_statistics(str(repo), **filters, disk_cache=True)
+        stats_client.get_commit_statistics(str(repo), **{**filters, **changed}, disk_cache=True)
+        assert statuses == [200, 200]
+
+    def test_other_api_misses(self, stats_client, statuses, repo, tmp_path):
+        stats_client.get_commit_statistics(str(repo), branch="main", disk_cache=True)
+        # The TestClient answers for any host
+        other_client = GitStatsClient("http://otherserver", stats_cache_dir=tmp_path / "cache")
+        other_client.session = stats_client.session
+        other_client.get_commit_statistics(str(repo), branch="main", disk_cache=True)
+        assert statuses == [200, 200]
+
+    def test_refresh_bypasses_the_cache(self, stats_client, statuses, repo):
+        stats_client.get_commit_statistics(str(repo), branch="main", disk_cache=True)
+        stats_client.get_commit_statistics(str(repo), branch="main", disk_cache=True, refresh=True)
+        assert statuses == [200, 200]
+
+    def test_nothing_is_cached_without_disk_cache(self, stats_client, statuses, repo, tmp_path):
+        stats_client.get_commit_statistics(str(repo), branch="main")
+        stats_client.get_commit_statistics(str(repo), branch="main", disk_cache=True)
+        assert statuses == [200, 200]
+        assert len(list((tmp_path / "cache").iterdir())) == 1
+
+    def test_expired_entries_miss(self, stats_client, statuses, repo):
+        stats_client.stats_cache_ttl = -1
+        stats_client.get_commit_statistics(str(repo), branch="main", disk_cache=True)
+        stats_client.get_commit_statistics(str(repo), branch="main", disk_cache=True)
+        assert statuses == [200, 200]
@@ -0,0 +1,260 @@
+"""
+Tests for the GitStats API endpoints.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app, git_stats_app
+
+
+@pytest.fixture(params=["pygit2", "cli"])
+def backend_client(request, client, monkeypatch):
+    """client, reading the repository in-process with pygit2, then again with the git CLI fallbacks."""
+    if request.param == "cli":
+        monkeypatch.setattr("app.main.pygit2", None)
+        # Setting the repository again opens it without pygit2
+        repo = git_stats_app.get_config().repo_path_str
+        client.post("/set_repo", json={"repo": ""}).raise_for_status()
+        client.post("/set_repo", json={"repo": repo}).raise_for_status()
+        assert git_stats_app.get_config().repo is None
+    return client
+
+
+class TestRevalidation:
+    """ETags on /branches and /top_authors, and 304 responses to If-None-Match."""
+
+    @pytest.mark.parametrize("endpoint", ["/branches", "/top_authors"])
+    def test_matching_etag_returns_304(self, client, endpoint):
+        first = client.get(endpoint)
+        assert first.status_code == 200
+        etag = first.headers["ETag"]
+
+        second = client.get(endpoint, headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.headers["ETag"] == etag
+        assert second.content == b""
+
+    @pytest.mark.parametrize("header", ['W/{etag}', '"other", {etag}', '"other",W/{etag}', "*"])
+    def test_weak_and_listed_etags_match(self, client, header):
+        etag = client.get("/branches").headers["ETag"]
+        response = client.get("/branches", headers={"If-None-Match": header.format(etag=etag)})
+        assert response.status_code == 304
+
+    def test_other_etag_returns_body(self, client):
+        response = client.get("/branches", headers={"If-None-Match": '"other", W/"another"'})
+        assert response.status_code == 200
+        assert response.json()["DATA"]["branches"] == ["dev", "main"]
+
+    def test_new_branch_changes_etag(self, client, repo, git):
+        etag = client.get("/branches").headers["ETag"]
+        git(repo, "branch", "release")
+
+        response = client.get("/branches", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert "release" in response.json()["DATA"]["branches"]
+
+
+class TestTopAuthors:
+    """/top_authors filters and the /top_authors_batch endpoint."""
+
+    def test_counts_authors_on_current_branch(self, client):
+        data = client.get("/top_authors").json()["DATA"]
+        assert data["branch"] == "main"
+        assert data["top_authors"] == [{"name": "Alice", "commit_count": 2}, {"name": "Bob", "commit_count": 1}]
+        assert data["total_authors"] == 2
+
+    def test_min_commits_drops_smaller_authors(self, client):
+        data = client.get("/top_authors", params={"min_commits": 2}).json()["DATA"]
+        assert data["top_authors"] == [{"name": "Alice", "commit_count": 2}]
+        # Authors below min_commits are still counted
+        assert data["total_authors"] == 2
+        assert data["min_commits"] == 2
+
+    def test_min_commits_must_be_positive(self, client):
+        assert client.get("/top_authors", params={"min_commits": 0}).status_code == 422
+
+    def test_batch_returns_results_in_query_order(self, client, repo):
+        queries = [{"branch": "dev", "repo": str(repo)}, {"branch": "main", "limit": 1}]
+        response = client.post("/top_authors_batch", json=queries)
+        assert response.status_code == 200
+        data = response.json()["DATA"]
+        assert [result["branch"] for result in data] == ["dev", "main"]
+        assert data[0]["top_authors"][0] == {"name": "Alice", "commit_count": 3}
+        assert len(data[1]["top_authors"]) == 1
+
+    def test_batch_matches_single_queries(self, client):
+        queries = [
+            {"after": "2000-01-01"},
+            {"after": "2099-01-01"},
+            {"branch": "dev", "before": "2099-01-01", "min_commits": 2},
+            {"branch": "main", "limit": 1},
+        ]
+        data = client.post("/top_authors_batch", json=queries).json()["DATA"]
+        for query, result in zip(queries, data):
+            expected = client.get("/top_authors", params=query).json()["DATA"]
+            for key in ("top_authors", "total_authors", "branch"):
+                assert result[key] == expected[key]
+        assert data[1]["total_authors"] == 0
+
+    def test_batch_rejects_mixed_repositories(self, client, repo, tmp_path):
+        other = tmp_path / "other"
+        other.mkdir()
+        response = client.post("/top_authors_batch", json=[{"repo": str(repo)}, {"repo": str(other)}])
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("count", [0, 51])
+    def test_batch_size_is_bounded(self, client, count):
+        response = client.post("/top_authors_batch", json=[{"limit": 1}] * count)
+        assert response.status_code == 422
+
+    def test_batch_rejects_unknown_branch(self, client):
+        response = client.post("/top_authors_batch", json=[{"branch": "main"}, {"branch": "missing"}])
+        assert response.status_code == 400
+
+
+class TestCommitCount:
+    """/commit_count, with pygit2 and with the git CLI."""
+
+    def test_branches_are_listed(self, backend_client):
+        data = backend_client.get("/branches").json()["DATA"]
+        assert data["branches"] == ["dev", "main"]
+        assert data["branch"] == "main"
+
+    @pytest.mark.parametrize("branch, count", [(None, 3), ("dev", 4)])
+    def test_counts_commits(self, backend_client, branch, count):
+        params = {"branch": branch} if branch else {}
+        assert backend_client.get("/commit_count", params=params).json()["DATA"]["commit_count"] == count
+
+    def test_first_parent_skips_merged_commits(self, backend_client, repo, git):
+        git(repo, "merge", "--quiet", "--no-ff", "-m", "Merge dev", "dev")
+        assert backend_client.get("/commit_count").json()["DATA"]["commit_count"] == 5
+
+        data = backend_client.get("/commit_count", params={"first_parent": "true"}).json()["DATA"]
+        assert data["commit_count"] == 4
+        assert data["first_parent"] is True
+
+
+class TestCommitStatistics:
+    """/commit_statistics sums the --shortstat lines of the matching commits."""
+
+    def test_sums_files_insertions_and_deletions(self, client, repo, git):
+        (repo / "a.txt").write_text("one\ntwo\nthree\n")
+        git(repo, "add", "a.txt")
+        git(repo, "commit", "--quiet", "-m", "Add a.txt")
+        (repo / "a.txt").write_text("one\n2\n")
+        (repo / "b.txt").write_text("b\n")
+        git(repo, "add", "a.txt", "b.txt")
+        git(repo, "commit", "--quiet", "-m", "Change a.txt, add b.txt")
+
+        data = client.get("/commit_statistics").json()["DATA"]["commit_statistics"]
+        # "1 file changed, 3 insertions(+)", then "2 files changed, 2 insertions(+), 2 deletions(-)"
+        assert (data["files"], data["insertions"], data["deletions"]) == (3, 5, 2)
+
+    def test_empty_commits_count_nothing(self, client):
+        data = client.get("/commit_statistics").json()["DATA"]["commit_statistics"]
+        assert (data["files"], data["insertions"], data["deletions"]) == (0, 0, 0)
+
+
+class TestSetRepo:
+    """/set_repo, and the repository set from the environment at startup."""
+
+    def test_repo_in_json_body(self, client, tmp_path, git):
+        other = tmp_path / "other repo"
+        git(tmp_path, "init", "--quiet", "--initial-branch=trunk", str(other))
+        git(other, "commit", "--quiet", "--allow-empty", "-m", "First")
+
+        response = client.post("/set_repo", json={"repo": str(other)})
+        assert response.status_code == 200
+        assert response.json()["DATA"]["repo"] == str(other.resolve())
+        assert client.get("/branches").json()["DATA"]["branches"] == ["trunk"]
+
+    def test_body_takes_precedence_over_query(self, client, repo, tmp_path):
+        response = client.post("/set_repo", params={"repo": str(tmp_path / "missing")}, json={"repo": str(repo)})
+        assert response.status_code == 200
+        assert response.json()["DATA"]["repo"] == str(repo.resolve())
+
+    def test_repo_from_environment(self, repo, monkeypatch):
+        monkeypatch.setenv("GITSTATS_REPO_PATH", str(repo))
+        config = git_stats_app.get_config()
+        config.clear_repo_path()
+        try:
+            with TestClient(app) as test_client:
+                data = test_client.get("/current_branch_internal").json()["DATA"]
+        finally:
+            config.clear_repo_path()
+        assert data["repo"] == str(repo.resolve())
+
+
+class TestSetBranch:
+    """/set_branch with and without validate."""
+
+    def test_unknown_branch_is_404_with_validate(self, client):
+        response = client.post("/set_branch", params={"branch": "missing", "validate": "true"})
+        assert response.status_code == 404
+        assert client.get("/current_branch_internal").json()["DATA"]["branch"] is None
+
+    def test_unknown_branch_without_validate_reports_error(self, client):
+        response = client.post("/set_branch", params={"branch": "missing"})
+        assert response.status_code == 200
+        assert "error" in response.json()
+
+    def test_known_branch_is_set(self, client):
+        response = client.post("/set_branch", params={"branch": "dev", "validate": "true"})
+        assert response.status_code == 200
+        assert client.get("/current_branch").json()["DATA"]["branch"] == "dev"
+
+
+class TestRefsFingerprint:
+    """Memoized branch data follows changes made to the repository outside the API."""
+
+    def test_nested_branch_is_listed(self, client, repo, git):
+        git(repo, "branch", "feature/one")
+        client.get("/branches")
+        git(repo, "branch", "feature/two")
+
+        branches = client.get("/branches").json()["DATA"]["branches"]
+        assert branches == ["dev", "feature/one", "feature/two", "main"]
+        assert client.get("/commit_count", params={"branch": "feature/two"}).status_code == 200
+
+    def test_deleted_branch_is_rejected(self, client, repo, git):
+        git(repo, "branch", "feature/gone")
+        assert client.get("/commit_count", params={"branch": "feature/gone"}).status_code == 200
+        git(repo, "branch", "-D", "feature/gone")
+
+        assert client.get("/commit_count", params={"branch": "feature/gone"}).status_code == 400
+
+    def test_checkout_changes_current_branch(self, client, repo, git):
+        assert client.get("/branches").json()["DATA"]["branch"] == "main"
+        git(repo, "checkout", "--quiet", "dev")
+        assert client.get("/branches").json()["DATA"]["branch"] == "dev"
+
+    def test_bare_repository_is_fingerprinted(self, client, repo, tmp_path, git):
+        bare = tmp_path / "bare.git"
+        git(repo, "clone", "--quiet", "--bare", str(repo), str(bare))
+        assert client.get("/branches", params={"repo": str(bare)}).json()["DATA"]["branches"] == ["dev", "main"]
+        git(bare, "branch", "feature/bare")
+
+        assert "feature/bare" in client.get("/branches").json()["DATA"]["branches"]
+
+    def test_failed_branch_listing_is_an_error(self, client, tmp_path):
+        not_a_repo = tmp_path / "plain"
+        not_a_repo.mkdir()
+        assert client.get("/branches", params={"repo": str(not_a_repo)}).status_code == 400
+
+
+
+class TestClearCache:
+    """/clear_cache drops cached git output."""
+
+    def test_cached_output_is_dropped(self, client, repo, git, monkeypatch):
+        # A commit made within the refs fingerprint's timestamp resolution may not change it
+        monkeypatch.setattr(git_stats_app.get_config(), "refs_fingerprint", lambda: ())
+        assert client.get("/commit_count").json()["DATA"]["commit_count"] == 3
+        git(repo, "commit", "--quiet", "--allow-empty", "-m", "Unseen")
+        assert client.get("/commit_count").json()["DATA"]["commit_count"] == 3
+
+        response = client.post("/clear_cache")
+        assert response.status_code == 200
+        assert response.json()["DATA"]["repo"] == str(repo.resolve())
+        assert client.get("/commit_count").json()["DATA"]["commit_count"] == 4